@@ -1,14 +1,171 @@
 import os
+import sys
 import time
 import logging
 import requests
-import pandas as pd
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 import json
+import orjson
 import datetime
-from decimal import Decimal, ROUND_HALF_UP
-import decimal as decimal_module
 import re
+import functools
+import math
+from collections import Counter, namedtuple
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import ijson  # Опционально: потоковый разбор больших ответов в initialize_cache
+except ImportError:
+    ijson = None
+
+
+# Пороги (по модулю итогового значения), до которых числа форматируются через float без потери точности:
+# double хранит ~15-16 значащих цифр, а проверке на границу округления нужен еще один верный знак,
+# поэтому 6 знаков после запятой - до 1e8, центы - до 1e13
+_VALUE_FAST_PATH_LIMIT = 1e8
+_USD_FAST_PATH_LIMIT = 1e13
+
+# Шаблоны ссылок на блокчейн-эксплореры по сети
+_EXPLORERS = {
+    "ethereum": "https://etherscan.io/address/{}",
+    "bsc": "https://bscscan.com/address/{}",
+    "polygon": "https://polygonscan.com/address/{}",
+    "arbitrum_one": "https://arbiscan.io/address/{}",
+    "avalanche": "https://snowtrace.io/address/{}",
+    "optimism": "https://optimistic.etherscan.io/address/{}",
+    "base": "https://basescan.org/address/{}"
+}
+
+
+def _build_reverse_synonyms(synonyms):
+    """Строит обратный маппинг синонимов: {нормализованный символ: [синонимы, отличные от него]}."""
+    reverse = {}
+    for syn, original in synonyms.items():
+        if syn != original:
+            reverse.setdefault(original, []).append(syn)
+    return reverse
+
+
+# Признаки ограничения частоты запросов в теле ответа 403 (ищем по сырым байтам)
+# UTC-метки вида 2024-01-01T10:00:00(.123)Z - только их _preprocess_batch разбирает векторно;
+# метки со смещением, эпохи и прочее форматируются поштучно через _format_timestamp
+_ISO_UTC_RE = re.compile(r'[1-9]\d{3}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?Z')
+
+# Целое из 19+ цифр: orjson читает целые за пределами 64 бит как float, stdlib json - точно
+_BIG_INT_RE = re.compile(rb'[:,\[]\s*-?\d{19,}\s*[,\]}]')
+
+_RATE_LIMIT_RE = re.compile(rb'throttl|rate[- ]?limit', re.IGNORECASE)
+
+# Запись кеша адресов: компактнее словаря и с доступом к полям по атрибуту
+AddrEntry = namedtuple('AddrEntry', 'name type is_real')
+
+# Размер пула соединений сессии (см. HTTPAdapter в __init__); ограничивает число параллельных запросов
+_POOL_MAXSIZE = 8
+
+# Множители для перевода lookback ('30m', '6h', '1d', '1w') в секунды
+_LOOKBACK_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+# Счетчик изменений общего (shared_cache) кеша адресов: по нему экземпляр видит записи, добавленные
+# другими экземплярами, и пересобирает свой список адресов CEX
+_shared_address_cache_version = 0
+
+
+def _parse_lookback_seconds(lookback):
+    """Переводит lookback вида '1d' в секунды. Возвращает None для нераспознанного формата."""
+    if not isinstance(lookback, str) or len(lookback) < 2:
+        return None
+    multiplier = _LOOKBACK_UNITS.get(lookback[-1].lower())
+    if multiplier is None or not lookback[:-1].isdigit():
+        return None
+    return int(lookback[:-1]) * multiplier
+
+
+def _intern_str(value):
+    """Интернирует строку (повторяющиеся chain/symbol/type разделяют один объект), прочее возвращает как есть."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _dig(d, *keys, default=None):
+    """Достает вложенное значение по цепочке ключей (int-ключ - индекс списка); default, если звено отсутствует."""
+    for key in keys:
+        if isinstance(d, dict):
+            d = d.get(key)
+        elif isinstance(d, list) and isinstance(key, int) and -len(d) <= key < len(d):
+            d = d[key]
+        else:
+            return default
+        if d is None:
+            return default
+    return d
+
+
+@functools.lru_cache(maxsize=4096)
+def _fmt_ts(timestamp_str):
+    """Разбирает ISO-метку и форматирует ее (кешируется: метки повторяются между опросами одного окна)."""
+    iso_str = timestamp_str[:-1] + '+00:00' if timestamp_str.endswith('Z') else timestamp_str
+    return datetime.datetime.fromisoformat(iso_str).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _loads_json(content):
+    """
+    Разбирает тело ответа C-парсером orjson по сырым байтам (без промежуточного декодирования в str),
+    сохраняя результат stdlib json: NaN/Infinity (orjson их отвергает) и целые длиннее 64 бит
+    (orjson превращает их в float) разбираются через json.loads.
+    """
+    if not _BIG_INT_RE.search(content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass  # stdlib json либо примет тело (NaN, Infinity), либо поднимет ту же ошибку
+    return json.loads(content)
+
+
+def _memoize_by_value(format_func):
+    """Оборачивает форматтер кешем в пределах одной пачки.
+
+    Ключ включает тип (1, 1.0 и True равны как ключи dict, но форматируются по-разному);
+    нехешируемые значения (списки, словари) форматируются без кеша.
+    """
+    cache = {}
+    def format_cached(value):
+        key = (type(value), value)
+        try:
+            return cache[key]
+        except KeyError:
+            result = cache[key] = format_func(value)
+            return result
+        except TypeError:
+            return format_func(value)
+    return format_cached
+
+
+@functools.lru_cache(maxsize=8192)
+def _build_address_display(address_str, chain_str, entity_name, entity_type, label_name):
+    """Собирает (display text, explorer URL, is_real_name) из частей адреса.
+
+    Кешируется по полному набору входных данных: одни и те же кошельки повторяются между опросами,
+    а смена сети, сущности или метки дает другой ключ.
+    """
+    entity_type_display = f" ({entity_type.capitalize()})" if entity_type and type(entity_type) is str else ""
+    is_real_name = bool(entity_name or label_name)
+    # Определяем финальное отображаемое имя (без адреса комбинируем только имя сущности и метку)
+    if entity_name:
+        display_name = f"{entity_name}{entity_type_display} - {label_name}" if label_name else f"{entity_name}{entity_type_display}"
+    elif label_name:
+        display_name = label_name
+    elif address_str and len(address_str) > 10:
+        # Сокращенный адрес нужен только здесь, поэтому строим его лениво
+        display_name = f"{address_str[:5]}...{address_str[-5:]}"
+    else:
+        display_name = address_str or "N/A"
+    
+    # Создаем ссылку на блокчейн-эксплорер
+    formatter = _EXPLORERS.get(chain_str) if address_str and chain_str else None
+    explorer_url = formatter.format(address_str) if formatter else None
+    return display_name, explorer_url, is_real_name
 
 
 class ArkhamMonitor:
@@ -18,8 +175,8 @@ class ArkhamMonitor:
     """
     
     # Статический кеш, который будет общим для всех экземпляров класса
-    _global_address_cache = {}  # {identifier: {'name': display_name, 'type': entity_type, 'is_real': is_real_name}}
-    _global_token_cache = {}    # {token_id: token_symbol}
+    _global_address_cache = {}  # {identifier: AddrEntry(name, type, is_real)}
+    _global_token_cache = {}    # {token_id (lowercase): token_symbol}
     _global_symbol_to_ids = {}  # {symbol: set(token_ids)}
     
     # Синонимы токенов для поддержки различных вариантов написания
@@ -29,8 +186,10 @@ class ArkhamMonitor:
         'ETH': 'WETH',
         'WETH': 'WETH',
     }
+    # Обратные синонимы считаются один раз при загрузке класса
+    _reverse_synonyms = _build_reverse_synonyms(_token_synonyms)
     
-    def __init__(self, api_key=None, api_base_url=None, config=None, shared_cache=True):
+    def __init__(self, api_key=None, api_base_url=None, config=None, shared_cache=True, strict_rounding=False):
         """
         Инициализация монитора с API ключом и базовым URL.
         
@@ -39,12 +198,16 @@ class ArkhamMonitor:
             api_base_url (str, optional): Базовый URL API. Если None, будет загружен из .env или использован стандартный
             config (dict, optional): Словарь с дополнительными параметрами конфигурации
             shared_cache (bool, optional): Использовать общий кеш для всех экземпляров класса
+            strict_rounding (bool, optional): Форматировать суммы только через Decimal (ROUND_HALF_UP)
+                вместо быстрого пути на float
         """
         # Настройка логирования
         self._setup_logger()
         
-        # Загрузка конфигурации из .env
-        load_dotenv()
+        # Загрузка конфигурации из .env (только если что-то не передано явно)
+        if api_key is None or api_base_url is None:
+            from dotenv import load_dotenv
+            load_dotenv()
         
         # Установка API параметров
         self.api_key = api_key or os.getenv('ARKHAM_API_KEY')
@@ -65,13 +228,17 @@ class ArkhamMonitor:
             'monitor_usd_gte': 10_000_000,
             'monitor_limit': 100,
             'target_token_symbols': ['BITCOIN', 'USDC'],
-            'target_entity_keyword': 'cex'  # Активируем ранее закомментированный фильтр
+            'target_entity_keyword': 'cex',  # Активируем ранее закомментированный фильтр (строка или список слов)
+            'stream_min_limit': 1000,  # С какого initial_limit разбирать ответ потоково (нужен ijson)
+            'initial_chunks': 1  # На сколько окон делить initial_lookback для параллельных запросов
         }
         
         # Обновление конфигурации, если она предоставлена
         if config:
             self.config.update(config)
         
+        self.strict_rounding = strict_rounding
+        
         # Инициализация локальных или глобальных кешей
         self.shared_cache = shared_cache
         if shared_cache:
@@ -85,51 +252,96 @@ class ArkhamMonitor:
             self._token_cache = {}
             self._symbol_to_ids = {}
         
-        # Маппинг CEX адресов для фильтрации
+        # Маппинг CEX адресов для фильтрации (поддерживается инкрементально в _update_caches)
+        self._set_cex_keywords()
         self._cex_addresses = set()
+        self._update_cex_addresses()  # Полная сборка по уже накопленному (например, общему) кешу
+        
+        # Нормализованные целевые символы токенов (пересчитываются только при смене конфигурации)
+        self._normalized_target_symbols = ()
+        self._normalize_targets()
+        
+        # Сырые данные транзакций последнего запроса {TxID: raw tx} (см. get_transaction_details)
+        self._raw_by_txid = {}
+        
+        # HTTP-сессия с пулом соединений (keep-alive и повторное использование TLS между опросами)
+        self._session = self._new_session()
         
         self.logger.info(f"Инициализация монитора Arkham. API URL: {self.api_base_url}")
     
+    def set_config(self, config):
+        """
+        Обновляет конфигурацию мониторинга и пересчитывает производные от нее данные.
+        
+        Args:
+            config (dict): Параметры конфигурации для обновления
+        """
+        self.config.update(config)
+        self._normalize_targets()
+        self._set_cex_keywords()
+        self._update_cex_addresses()
+    
+    def _normalize_targets(self):
+        """Нормализует target_token_symbols по _token_synonyms (оригинальный символ добавляется, если отличается)."""
+        target_symbols = self.config.get('target_token_symbols')
+        if not target_symbols or not isinstance(target_symbols, list):
+            self._normalized_target_symbols = ()
+            return
+        
+        normalized_symbols = []
+        for sym in target_symbols:
+            normalized = self.__class__._token_synonyms.get(sym, sym)
+            normalized_symbols.append(normalized)
+            if normalized != sym:
+                normalized_symbols.append(sym)
+        self._normalized_target_symbols = tuple(normalized_symbols)
+    
     def _setup_logger(self):
         """Настройка логгера."""
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger('ArkhamMonitor')
         logging.getLogger('urllib3').setLevel(logging.WARNING)  # Reduce requests library noise
     
-    def _get_transfers(self, params=None):
+    def _new_session(self):
+        """Создает HTTP-сессию с пулом соединений, повторами и заголовком API-Key."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False  # Последний ответ отдаем в raise_for_status, чтобы сохранить обработку HTTP ошибок
+            )
+        )
+        session.mount('https://', adapter)
+        session.headers['API-Key'] = self.api_key
+        return session
+    
+    def _send_request(self, params=None, stream=False, session=None):
         """
-        Запрос данных о транзакциях из Arkham API.
+        Выполняет GET запрос к /transfers и переводит ошибки HTTP/сети в ArkhamAPIError.
         
         Args:
             params (dict): Параметры запроса
+            stream (bool): Не загружать тело ответа сразу (для потокового разбора)
+            session (requests.Session, optional): Сессия для запроса (по умолчанию общая self._session)
             
         Returns:
-            dict: Данные о транзакциях или None в случае ошибки
+            requests.Response: Успешный ответ API
         """
-        headers = {"API-Key": self.api_key}
         endpoint = f"{self.api_base_url.rstrip('/')}/transfers"
         request_params = params or {}
         
         self.logger.debug(f"Запрос к Arkham API: URL={endpoint}, Params={request_params}")
         
         try:
-            response = requests.get(endpoint, headers=headers, params=request_params, timeout=60)
+            response = (session or self._session).get(endpoint, params=request_params, timeout=60, stream=stream)
             response.raise_for_status()
             
             self.logger.debug(f"Arkham API ответил статусом {response.status_code}")
-            
-            try:
-                data = response.json()
-                count = data.get('count', 'N/A')
-                transfers_list = data.get('transfers')
-                transfers_count = len(transfers_list) if isinstance(transfers_list, list) else 0
-                
-                self.logger.debug(f"Получено записей: {count}, transfers в ответе: {transfers_count}")
-                return data
-            except json.JSONDecodeError as json_err:
-                self.logger.error(f"Ошибка декодирования JSON от Arkham API: {json_err}")
-                self.logger.error(f"Текст ответа (начало): {response.text[:500]}")
-                raise self.ArkhamAPIError(f"JSON Decode Error: {json_err}") from json_err
+            return response
                 
         except requests.exceptions.HTTPError as http_err:
             self.logger.error(f"HTTP ошибка при запросе к Arkham API: {http_err}")
@@ -147,7 +359,7 @@ class ArkhamMonitor:
             if status_code == 401:
                 raise self.ArkhamAPIError("Ошибка авторизации (401 Unauthorized). Проверьте API ключ.") from http_err
             elif status_code == 403:
-                if 'throttled' in response_text.lower() or 'rate limit' in response_text.lower():
+                if _RATE_LIMIT_RE.search(http_err.response.content[:500]):
                     raise self.ArkhamAPIError("API Rate Limit Exceeded (403 Forbidden)") from http_err
                 raise self.ArkhamAPIError(f"Доступ запрещен (403 Forbidden).") from http_err
             else:
@@ -156,35 +368,122 @@ class ArkhamMonitor:
         except requests.exceptions.RequestException as req_err:
             self.logger.error(f"Ошибка соединения с Arkham API: {req_err}")
             raise self.ArkhamAPIError(f"Request Failed: {req_err}") from req_err
+    
+    def _get_transfers(self, params=None, session=None):
+        """
+        Запрос данных о транзакциях из Arkham API.
+        
+        Args:
+            params (dict): Параметры запроса
+            session (requests.Session, optional): Сессия для запроса (по умолчанию общая self._session)
             
-        return None
+        Returns:
+            dict: Данные о транзакциях или None в случае ошибки
+        """
+        response = self._send_request(params, session=session)
+        
+        try:
+            data = _loads_json(response.content)
+            count = data.get('count', 'N/A')
+            transfers_list = data.get('transfers')
+            transfers_count = len(transfers_list) if isinstance(transfers_list, list) else 0
+            
+            self.logger.debug(f"Получено записей: {count}, transfers в ответе: {transfers_count}")
+            return data
+        except json.JSONDecodeError as json_err:
+            self.logger.error(f"Ошибка декодирования JSON от Arkham API: {json_err}")
+            self.logger.error(f"Текст ответа (начало): {response.text[:500]}")
+            raise self.ArkhamAPIError(f"JSON Decode Error: {json_err}") from json_err
+    
+    def _get_transfers_chunked(self, lookback, usd_gte, limit, n_chunks=4):
+        """
+        Делит окно lookback на n_chunks подокон (timeGte/timeLte) и запрашивает их параллельно,
+        каждое через свою сессию. Результаты объединяются в один ответ.
+        
+        Args:
+            lookback (str): Период вида '1d', '6h'
+            usd_gte: Минимальная сумма в USD
+            limit (int): Максимальное число транзакций в итоговом ответе
+            n_chunks (int): Количество подокон (не больше _POOL_MAXSIZE)
+            
+        Returns:
+            dict: Ответ в формате /transfers ({'transfers': [...], 'count': N})
+        """
+        lookback_seconds = _parse_lookback_seconds(lookback)
+        n_chunks = max(1, min(n_chunks, _POOL_MAXSIZE))
+        if lookback_seconds is None or n_chunks == 1:
+            return self._get_transfers(params={'timeLast': lookback, 'usdGte': usd_gte, 'limit': limit})
+        
+        now_ms = int(time.time() * 1000)
+        window_ms = lookback_seconds * 1000 // n_chunks
+        chunk_params = []
+        for i in range(n_chunks):
+            # Границы timeGte/timeLte включительные: верх более старого окна на 1 мс ниже низа соседнего,
+            # иначе транзакция ровно на границе пришла бы дважды
+            boundary = now_ms - i * window_ms
+            time_lte = boundary if i == 0 else boundary - 1
+            time_gte = now_ms - lookback_seconds * 1000 if i == n_chunks - 1 else boundary - window_ms
+            chunk_params.append({'timeGte': time_gte, 'timeLte': time_lte, 'usdGte': usd_gte, 'limit': limit})
+        
+        def fetch_window(params):
+            # requests.Session не гарантирует потокобезопасность, поэтому общую self._session потоки не делят
+            with self._new_session() as session:
+                return self._get_transfers(params, session=session)
+        
+        with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+            futures = [executor.submit(fetch_window, params) for params in chunk_params]
+            responses = [future.result() for future in futures]
+        
+        merged = []
+        for data in responses:
+            if data and isinstance(data.get('transfers'), list):
+                merged.extend(data['transfers'])
+        # Как и одиночный запрос, оставляем limit самых свежих транзакций
+        merged.sort(key=lambda tx: tx.get('blockTimestamp') or '', reverse=True)
+        merged = merged[:limit] if limit else merged
+        return {'transfers': merged, 'count': len(merged)}
+    
+    def _get_transfers_stream(self, params=None):
+        """
+        Потоково разбирает ответ /transfers и отдает обработанные транзакции по мере чтения из сокета.
+        
+        Args:
+            params (dict): Параметры запроса
+            
+        Yields:
+            dict: Обработанная транзакция или None для невалидной записи
+        """
+        response = self._send_request(params, stream=True)
+        response.raw.decode_content = True  # Распаковка gzip/deflate при чтении сырого потока
+        
+        try:
+            for tx in ijson.items(response.raw, 'transfers.item', use_float=True):
+                yield self._preprocess_transaction(tx)
+        except (ijson.JSONError, requests.exceptions.RequestException, Urllib3HTTPError) as stream_err:
+            self.logger.error(f"Ошибка потокового чтения ответа Arkham API: {stream_err}")
+            raise self.ArkhamAPIError(f"Stream Read Error: {stream_err}") from stream_err
+        finally:
+            response.close()
+    
+    def close(self):
+        """Закрывает HTTP-сессию и освобождает соединения из пула."""
+        self._session.close()
     
     def _format_timestamp(self, timestamp_str):
         """Форматирует временную метку."""
         if not timestamp_str: 
             return "N/A"
         try:
-            dt_object = datetime.datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            return dt_object.strftime('%Y-%m-%d %H:%M:%S')
-        except (ValueError, TypeError): 
+            return _fmt_ts(timestamp_str)
+        except (ValueError, TypeError, AttributeError): 
             return str(timestamp_str)
     
     def _get_explorer_link(self, address, chain):
         """Получает ссылку на блокчейн-эксплорер для адреса."""
         if not address or not chain: 
             return None
-            
-        explorers = {
-            "ethereum": "https://etherscan.io/address/{}",
-            "bsc": "https://bscscan.com/address/{}",
-            "polygon": "https://polygonscan.com/address/{}",
-            "arbitrum_one": "https://arbiscan.io/address/{}",
-            "avalanche": "https://snowtrace.io/address/{}",
-            "optimism": "https://optimistic.etherscan.io/address/{}",
-            "base": "https://basescan.org/address/{}"
-        }
         
-        formatter = explorers.get(chain)
+        formatter = _EXPLORERS.get(chain)
         return formatter.format(address) if formatter else None
     
     def _extract_address_from_obj(self, addr_obj):
@@ -200,14 +499,16 @@ class ArkhamMonitor:
         if not addr_obj:
             return None
         
-        if isinstance(addr_obj, dict):
+        # Декодеры JSON (orjson/ijson) отдают только точные dict/str, поэтому вместо isinstance
+        # используем сравнение типа - без обхода MRO на каждом вызове
+        if type(addr_obj) is dict:
             # Случай когда адрес представлен объектом с полем address
             if 'address' in addr_obj:
-                if isinstance(addr_obj['address'], str):
+                if type(addr_obj['address']) is str:
                     return addr_obj['address']
-                elif isinstance(addr_obj['address'], dict) and 'address' in addr_obj['address']:
+                elif type(addr_obj['address']) is dict and 'address' in addr_obj['address']:
                     return addr_obj['address']['address']
-        elif isinstance(addr_obj, str):
+        elif type(addr_obj) is str:
             # Случай когда адрес представлен строкой
             return addr_obj
         
@@ -226,93 +527,74 @@ class ArkhamMonitor:
         if not addr_data:
             return "N/A", None, None, False
         
-        display_name = "N/A"
-        explorer_url = None
         address_str = None
         chain_str = None
         entity_name = None
+        entity_type = None
         label_name = None
-        entity_type_display = ""
-        original_identifier = None
-        is_real_name = False
         
         # Обрабатываем случай когда addr_data объект с полным описанием
-        if isinstance(addr_data, dict):
+        if type(addr_data) is dict:
             # Извлекаем адрес, учитывая возможную вложенность
             address_str = self._extract_address_from_obj(addr_data)
             if not address_str and 'address' in addr_data:
                 address_str = self._extract_address_from_obj(addr_data['address'])
             
             chain_str = addr_data.get('chain')
-            original_identifier = address_str
             
             # Извлекаем данные arkhamEntity
             entity_data = addr_data.get('arkhamEntity')
-            if isinstance(entity_data, dict):
+            if type(entity_data) is dict:
                 entity_name = entity_data.get('name')
                 entity_type = entity_data.get('type')
-                if entity_type and isinstance(entity_type, str):
-                    entity_type_display = f" ({entity_type.capitalize()})"
-                if entity_name: 
-                    is_real_name = True
             
             # Извлекаем данные arkhamLabel
             label_data = addr_data.get('arkhamLabel')
-            if isinstance(label_data, dict):
+            if type(label_data) is dict:
                 label_name = label_data.get('name')
-                if label_name: 
-                    is_real_name = True
-            
-            # Если нет адреса, комбинируем доступную информацию
-            if not address_str:
-                if entity_name and label_name: 
-                    display_name = f"{entity_name}{entity_type_display} - {label_name}"
-                elif entity_name: 
-                    display_name = f"{entity_name}{entity_type_display}"
-                elif label_name: 
-                    display_name = label_name
-                else: 
-                    display_name = "N/A"; is_real_name = False
-                    
-                return display_name, None, None, is_real_name
         
         # Обрабатываем случай когда addr_data это строка адреса
-        elif isinstance(addr_data, str):
-            address_str = addr_data
-            original_identifier = address_str
-            is_real_name = False
-        else:
+        elif type(addr_data) is not str:
             return "N/A", None, None, False
-        
-        # Создаем сокращенную версию адреса
-        short_address = "N/A"
-        if address_str:
-            if len(address_str) > 10: 
-                short_address = f"{address_str[:5]}...{address_str[-5:]}"
-            else: 
-                short_address = address_str
-        
-        # Определяем финальное отображаемое имя
-        if entity_name and label_name:
-            display_name = f"{entity_name}{entity_type_display} - {label_name}"
-        elif entity_name:
-            display_name = f"{entity_name}{entity_type_display}"
-        elif label_name:
-            display_name = label_name
         else:
-            display_name = short_address
-            is_real_name = False
-        
-        # Создаем ссылку на блокчейн-эксплорер
-        explorer_url = self._get_explorer_link(address_str, chain_str) if address_str and chain_str else None
+            address_str = addr_data
         
-        return display_name, explorer_url, original_identifier, is_real_name
+        # Сборка строк кешируется по всем входным частям; нехешируемые значения из ответа собираем без кеша
+        parts = (address_str, chain_str, entity_name, entity_type, label_name)
+        try:
+            display_name, explorer_url, is_real_name = _build_address_display(*parts)
+        except TypeError:
+            display_name, explorer_url, is_real_name = _build_address_display.__wrapped__(*parts)
+        return display_name, explorer_url, address_str, is_real_name
     
     def _format_value(self, value, decimals):
         """Форматирует значение с учетом десятичных разрядов."""
         if value is None: 
             return "N/A"
+        
+        # Быстрый путь на float только для чисел (строки округляются по своему тексту через Decimal)
+        # и только пока итоговое значение укладывается в точность double для 6 знаков
+        scaled = None
+        if not self.strict_rounding and type(value) in (int, float):
+            try:
+                scaled = float(value)
+                if decimals is not None and decimals >= 0:
+                    scaled /= 10 ** decimals
+            except OverflowError:
+                scaled = None
+        # Значения на границе округления (7-й знак = 5) уходят в Decimal: там ROUND_HALF_UP по десятичному тексту
+        if (scaled is not None and math.isfinite(scaled) and abs(scaled) < _VALUE_FAST_PATH_LIMIT
+                and f"{scaled:.7f}"[-1] != '5'):
+            formatted_str = f"{scaled:.6f}"
             
+            if formatted_str == '0.000000' and scaled != 0:
+                return '0.000001'
+            
+            stripped_str = formatted_str.rstrip('0').rstrip('.')
+            return stripped_str if stripped_str else "0"
+        
+        # Точный путь на Decimal для больших и нестандартных значений
+        from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
         try:
             value_dec = Decimal(str(value))
             if decimals is not None and decimals >= 0:
@@ -331,7 +613,7 @@ class ArkhamMonitor:
                 
             return formatted_str
             
-        except (ValueError, TypeError, decimal_module.InvalidOperation) as e:
+        except (ValueError, TypeError, InvalidOperation) as e:
             self.logger.warning(f"Ошибка форматирования значения {value} с decimals {decimals}: {e}")
             return str(value)
     
@@ -339,21 +621,44 @@ class ArkhamMonitor:
         """Форматирует значение USD."""
         if usd_value is None: 
             return "N/A"
-            
+        
+        # Быстрый путь на float только для чисел в пределах точности double (см. _format_value);
+        # значения на половине цента (3-й знак = 5) округляются через Decimal (ROUND_HALF_UP)
+        if (not self.strict_rounding and type(usd_value) in (int, float) and abs(usd_value) < _USD_FAST_PATH_LIMIT
+                and f"{usd_value:.3f}"[-1] != '5'):
+            return f"${usd_value:,.2f}"
+        
+        from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
         try:
             usd_dec = Decimal(str(usd_value))
             formatted_usd = usd_dec.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
             return "${:,.2f}".format(formatted_usd)
-        except (ValueError, TypeError, decimal_module.InvalidOperation) as e:
+        except (ValueError, TypeError, InvalidOperation) as e:
             self.logger.warning(f"Ошибка форматирования USD {usd_value}: {e}")
             return str(usd_value)
     
-    def _preprocess_transaction(self, tx):
+    def _resolve_address_side(self, tx, address_key, addresses_key):
+        """
+        Возвращает (отображение, идентификатор, is_real, тип сущности) для одной стороны транзакции.
+        
+        Args:
+            tx (dict): Данные транзакции
+            address_key (str): Ключ одиночного адреса ('fromAddress'/'toAddress')
+            addresses_key (str): Ключ списка адресов ('fromAddresses'/'toAddresses')
+        """
+        addr_obj = tx.get(address_key) or _dig(tx, addresses_key, 0, 'address')
+        if not addr_obj:
+            return "N/A", None, False, None
+        display, _, identifier, is_real = self._format_address_display(addr_obj)
+        return display, identifier, is_real, _dig(addr_obj, 'arkhamEntity', 'type')
+    
+    def _preprocess_transaction(self, tx, formatted=None):
         """
         Подготавливает данные транзакции для DataFrame и кэша.
         
         Args:
             tx (dict): Данные транзакции
+            formatted (tuple, optional): Заранее отформатированные (Время, Кол-во, USD) из _preprocess_batch
             
         Returns:
             dict: Обработанные данные транзакции или None
@@ -365,94 +670,92 @@ class ArkhamMonitor:
         decimals_for_value = None  # В API transfers нет decimals
         usd_to_format = tx.get('historicalUSD')
         tx_id_display = tx.get('txid') or tx.get('transactionHash') or 'N/A'
-        chain = tx.get('chain', 'N/A')
-        
-        # --- Обработка From Address/Addresses ---
-        from_addr_data_raw = tx.get('fromAddress')
-        from_entity_type = None
-        from_identifier = None
-        from_display = "N/A"
-        from_is_real = False
-        
-        # Проверка наличия fromAddress
-        if from_addr_data_raw:
-            if isinstance(from_addr_data_raw, dict):
-                if isinstance(from_addr_data_raw.get('arkhamEntity'), dict):
-                    from_entity_type = from_addr_data_raw['arkhamEntity'].get('type')
-            
-            # Получаем отображаемый адрес и идентификатор
-            from_display, _, from_identifier, from_is_real = self._format_address_display(from_addr_data_raw)
-        
-        # Если нет fromAddress, но есть fromAddresses (случай Bitcoin)
-        elif 'fromAddresses' in tx and isinstance(tx['fromAddresses'], list) and tx['fromAddresses']:
-            # Для Bitcoin транзакций можно взять первый адрес для отображения
-            # или собрать информацию о всех адресах
-            first_from_item = tx['fromAddresses'][0]
-            if isinstance(first_from_item, dict):
-                # Получаем отображаемый адрес для первого адреса
-                addr_obj = first_from_item.get('address')
-                if addr_obj:
-                    from_display, _, from_identifier, from_is_real = self._format_address_display(addr_obj)
-                    
-                    # Получаем тип сущности, если есть
-                    if isinstance(addr_obj, dict) and isinstance(addr_obj.get('arkhamEntity'), dict):
-                        from_entity_type = addr_obj['arkhamEntity'].get('type')
-        
-        # --- Обработка To Address/Addresses ---
-        to_addr_data_raw = tx.get('toAddress')
-        to_entity_type = None
-        to_identifier = None
-        to_display = "N/A"
-        to_is_real = False
-        
-        # Проверка наличия toAddress
-        if to_addr_data_raw:
-            if isinstance(to_addr_data_raw, dict):
-                if isinstance(to_addr_data_raw.get('arkhamEntity'), dict):
-                    to_entity_type = to_addr_data_raw['arkhamEntity'].get('type')
-            
-            # Получаем отображаемый адрес и идентификатор
-            to_display, _, to_identifier, to_is_real = self._format_address_display(to_addr_data_raw)
-        
-        # Если нет toAddress, но есть toAddresses (аналогично fromAddresses)
-        elif 'toAddresses' in tx and isinstance(tx['toAddresses'], list) and tx['toAddresses']:
-            first_to_item = tx['toAddresses'][0]
-            if isinstance(first_to_item, dict):
-                addr_obj = first_to_item.get('address')
-                if addr_obj:
-                    to_display, _, to_identifier, to_is_real = self._format_address_display(addr_obj)
-                    
-                    # Получаем тип сущности, если есть
-                    if isinstance(addr_obj, dict) and isinstance(addr_obj.get('arkhamEntity'), dict):
-                        to_entity_type = addr_obj['arkhamEntity'].get('type')
+        chain = _intern_str(tx.get('chain', 'N/A'))
+        
+        # --- Обработка From/To Address; если адреса нет - первый из fromAddresses/toAddresses (случай Bitcoin) ---
+        from_display, from_identifier, from_is_real, from_entity_type = self._resolve_address_side(tx, 'fromAddress', 'fromAddresses')
+        to_display, to_identifier, to_is_real, to_entity_type = self._resolve_address_side(tx, 'toAddress', 'toAddresses')
         
         # Получение символа токена и добавление числового значения USD
-        token_symbol = tx.get('tokenSymbol') or tx.get('chain', 'N/A').upper()
-        usd_string = self._format_usd(usd_to_format)
+        token_symbol = _intern_str(tx.get('tokenSymbol') or tx.get('chain', 'N/A').upper())
         usd_numeric = usd_to_format
+        if formatted is not None:
+            time_string, value_string, usd_string = formatted
+        else:
+            time_string = self._format_timestamp(tx.get('blockTimestamp'))
+            value_string = self._format_value(value_to_format, decimals_for_value)
+            usd_string = self._format_usd(usd_to_format)
         
         # Базовые данные для DataFrame
         processed = {
-            "Время": self._format_timestamp(tx.get('blockTimestamp')),
+            "Время": time_string,
             "Сеть": chain,
             "Откуда": from_display,
             "Куда": to_display,
             "Токен ID": tx.get('tokenId') or tx.get('tokenSymbol') or tx.get('tokenName') or chain.upper(),
             "Символ": token_symbol,
-            "Кол-во": self._format_value(value_to_format, decimals_for_value),
+            "Кол-во": value_string,
             "USD": usd_string,
             "USD_numeric": usd_numeric,  # Добавляем числовое значение USD
+            "TxID": tx_id_display,
             "_raw_data": tx,
             "_from_identifier": from_identifier,
             "_to_identifier": to_identifier,
-            "_from_entity_type": from_entity_type,
-            "_to_entity_type": to_entity_type,
+            "_from_entity_type": _intern_str(from_entity_type),
+            "_to_entity_type": _intern_str(to_entity_type),
             "_from_is_real_name": from_is_real,
             "_to_is_real_name": to_is_real,
         }
         
         return processed
     
+    def _preprocess_batch(self, txs):
+        """
+        Подготавливает пачку транзакций: время, количество и USD форматируются
+        по колонкам за один проход вместо поштучных вызовов форматтеров.
+        
+        Args:
+            txs (list): Список сырых транзакций из API
+            
+        Returns:
+            list: Обработанные транзакции (невалидные отброшены)
+        """
+        import pandas as pd
+        
+        valid_txs = [tx for tx in txs if tx and isinstance(tx, dict)]
+        if not valid_txs:
+            return []
+        
+        ts, usd, val = [], [], []
+        for tx in valid_txs:
+            ts.append(tx.get('blockTimestamp'))
+            usd.append(tx.get('historicalUSD'))
+            val.append(tx.get('unitValue'))
+        
+        df = pd.DataFrame({'ts': ts, 'usd': usd, 'val': val}, dtype=object)
+        
+        # Векторно разбираем только UTC-метки с 'Z': для них utc=True не меняет время
+        is_utc = df['ts'].map(lambda v: type(v) is str and _ISO_UTC_RE.fullmatch(v) is not None).astype(bool)
+        times = pd.Series([None] * len(df), index=df.index, dtype=object)
+        if is_utc.any():
+            parsed = pd.to_datetime(df.loc[is_utc, 'ts'], utc=True, format='ISO8601', errors='coerce')
+            times[is_utc] = parsed.dt.strftime('%Y-%m-%d %H:%M:%S')
+        # Остальные (и нераспознанные, например 30 февраля) форматируем поштучно, как в _format_timestamp
+        unparsed = times.isna()
+        if unparsed.any():
+            times[unparsed] = df.loc[unparsed, 'ts'].map(self._format_timestamp)
+        
+        # Суммы в пачке часто повторяются - форматируем каждое уникальное значение один раз
+        usd_strings = df['usd'].map(_memoize_by_value(self._format_usd))
+        value_strings = df['val'].map(_memoize_by_value(lambda v: self._format_value(v, None)))
+        
+        # Один проход: обработка и отбрасывание None без промежуточного списка
+        return [
+            processed
+            for tx, formatted in zip(valid_txs, zip(times.tolist(), value_strings.tolist(), usd_strings.tolist()))
+            if (processed := self._preprocess_transaction(tx, formatted=formatted))
+        ]
+    
     def _update_caches(self, transactions):
         """
         Обновляет кеши адресов/сущностей и токенов.
@@ -463,8 +766,17 @@ class ArkhamMonitor:
         Returns:
             tuple: (new_addresses, new_tokens) - количество новых записей
         """
+        global _shared_address_cache_version
         new_addresses = 0
         new_tokens = 0
+        added_tokens = []
+        
+        # Общий кеш мог измениться другим экземпляром - тогда список CEX пересобирается полностью,
+        # свои изменения ниже отслеживаются инкрементально
+        if self.shared_cache and self._cex_synced_version != _shared_address_cache_version:
+            self._update_cex_addresses()
+        start_version = _shared_address_cache_version
+        own_changes = 0
         
         for tx in transactions:
             if not tx: 
@@ -477,120 +789,140 @@ class ArkhamMonitor:
             ]:
                 identifier = tx.get(id_key)
                 display_name = tx.get(name_key)
-                entity_type = tx.get(type_key)
+                entity_type = _intern_str(tx.get(type_key))
                 is_real = tx.get(is_real_key)
                 
                 if identifier and identifier != "N/A":
                     name_to_store = display_name if (display_name and display_name != "N/A") else identifier
                     
-                    if identifier not in self._address_cache:
+                    new_entry = AddrEntry(name_to_store, entity_type, is_real)
+                    current_entry = self._address_cache.get(identifier)
+                    
+                    if current_entry is None:
                         # Новая запись
-                        self._address_cache[identifier] = {'name': name_to_store, 'type': entity_type, 'is_real': is_real}
+                        self._address_cache[identifier] = new_entry
+                        self._track_cex_address(identifier, entity_type)
                         new_addresses += 1
-                    else:
-                        # Существующая запись - обновляем
-                        current_entry = self._address_cache[identifier]
-                        updated = False
-                        
-                        if current_entry.get('name') != name_to_store:
-                            current_entry['name'] = name_to_store
-                            updated = True
-                            
-                        # Обновляем тип, если он появился
-                        if current_entry.get('type') is None and entity_type is not None:
-                            current_entry['type'] = entity_type
-                            updated = True
-                            
-                        # Обновляем флаг is_real, если он стал True
-                        if current_entry.get('is_real') is False and is_real is True:
-                            current_entry['is_real'] = True
-                            updated = True
+                        own_changes += 1
+                    elif current_entry != new_entry:
+                        # Существующая запись изменилась - одно сравнение кортежей вместо трех сравнений полей
+                        # Тип обновляем, только если он появился
+                        current_type = current_entry.type
+                        if current_type is None and entity_type is not None:
+                            current_type = entity_type
+                            self._track_cex_address(identifier, entity_type)
+                        # Флаг is_real только повышается до True
+                        self._address_cache[identifier] = AddrEntry(name_to_store, current_type, bool(current_entry.is_real or is_real))
+                        own_changes += 1
             
             # Токены
             token_id = tx.get('Токен ID')
             token_symbol = tx.get('Символ')
             
-            if token_id and token_id != "N/A" and token_id not in self._token_cache:
-                self._token_cache[token_id] = token_symbol if token_symbol else ''
-                new_tokens += 1
-        
-        # Обновляем маппинг символов к ID для фильтрации
-        self._update_symbol_to_ids_map(verbose=False)
-        
-        # Обновляем список адресов CEX для фильтрации
-        self._update_cex_addresses()
+            if token_id and token_id != "N/A":
+                # ID храним в нижнем регистре (так их ждет API), чтобы не приводить при каждой сборке фильтра
+                token_id_lc = token_id.lower()
+                if token_id_lc not in self._token_cache:
+                    self._token_cache[token_id_lc] = token_symbol if token_symbol else ''
+                    added_tokens.append((token_id_lc, self._token_cache[token_id_lc]))
+                    new_tokens += 1
+        
+        if self.shared_cache and own_changes:
+            _shared_address_cache_version += own_changes
+            if _shared_address_cache_version == start_version + own_changes:
+                self._cex_synced_version = _shared_address_cache_version
+            # иначе кеш менялся параллельно - следующий вызов пересоберет список CEX
+        
+        # Обновляем маппинг символов к ID для фильтрации (только новые токены)
+        self._update_symbol_to_ids_map(verbose=False, added_tokens=added_tokens)
         
         if new_addresses > 0:
-            self.logger.info(f"Добавлено {new_addresses} новых записей в кэш адресов.")
+            self.logger.info("Добавлено %d новых записей в кэш адресов.", new_addresses)
         if new_tokens > 0:
-            self.logger.info(f"Добавлено {new_tokens} новых токенов в кэш.")
+            self.logger.info("Добавлено %d новых токенов в кэш.", new_tokens)
             
         return new_addresses, new_tokens
     
-    def _update_symbol_to_ids_map(self, verbose=False):
+    def _update_symbol_to_ids_map(self, verbose=False, added_tokens=None):
         """
         Обновляет маппинг символов токенов к их ID.
         
         Args:
             verbose (bool): Выводить ли подробную информацию о состоянии кеша
+            added_tokens (list, optional): Новые пары (token_id, symbol). Если переданы,
+                маппинг дополняется только ими, иначе перестраивается целиком.
         """
-        # Очищаем маппинг перед обновлением
-        if self.shared_cache:
-            # Если используем общий кеш, обновляем статические переменные класса
-            self.__class__._global_symbol_to_ids = {}
-            token_cache = self.__class__._global_token_cache
-            symbol_to_ids = self.__class__._global_symbol_to_ids
+        if added_tokens is not None:
+            symbol_to_ids = self.__class__._global_symbol_to_ids if self.shared_cache else self._symbol_to_ids
+            for token_id, symbol in added_tokens:
+                self._add_token_to_symbol_map(symbol_to_ids, token_id, symbol)
         else:
-            # Иначе обновляем локальный кеш
-            self._symbol_to_ids = {}
-            token_cache = self._token_cache
-            symbol_to_ids = self._symbol_to_ids
-        
-        # Заполняем маппинг
-        for token_id, symbol in token_cache.items():
-            s = symbol if symbol else "N/A"
-            if s not in symbol_to_ids:
-                symbol_to_ids[s] = set()
-            symbol_to_ids[s].add(token_id)
-            
-            # Обрабатываем синонимы токенов
-            if s in self.__class__._token_synonyms:
-                normalized = self.__class__._token_synonyms[s]
-                if normalized not in symbol_to_ids:
-                    symbol_to_ids[normalized] = set()
-                symbol_to_ids[normalized].add(token_id)
-            
-            # Обрабатываем обратные синонимы
-            for syn, original in self.__class__._token_synonyms.items():
-                if s == original and syn != original:
-                    if syn not in symbol_to_ids:
-                        symbol_to_ids[syn] = set()
-                    symbol_to_ids[syn].add(token_id)
+            # Очищаем маппинг перед обновлением
+            if self.shared_cache:
+                # Если используем общий кеш, обновляем статические переменные класса
+                self.__class__._global_symbol_to_ids = {}
+                token_cache = self.__class__._global_token_cache
+                symbol_to_ids = self.__class__._global_symbol_to_ids
+            else:
+                # Иначе обновляем локальный кеш
+                self._symbol_to_ids = {}
+                token_cache = self._token_cache
+                symbol_to_ids = self._symbol_to_ids
+            
+            # Заполняем маппинг
+            for token_id, symbol in token_cache.items():
+                self._add_token_to_symbol_map(symbol_to_ids, token_id, symbol)
         
         # Отладочный вывод только если verbose=True
-        if verbose and self.shared_cache:
-            self.logger.info(f"Размер основного кеша токенов: {len(self.__class__._global_token_cache)}")
-            self.logger.info(f"Токены в кеше: {list(self.__class__._global_token_cache.values())}")
-            self.logger.info(f"Маппинг символ->ID: {self.__class__._global_symbol_to_ids}")
+        if verbose and self.shared_cache and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Размер основного кеша токенов: %d", len(self.__class__._global_token_cache))
+            self.logger.info("Токены в кеше: %s", list(self.__class__._global_token_cache.values()))
+            self.logger.info("Маппинг символ->ID: %s", self.__class__._global_symbol_to_ids)
+    
+    def _add_token_to_symbol_map(self, symbol_to_ids, token_id, symbol):
+        """Добавляет ID токена в маппинг под его символом и всеми синонимами."""
+        s = symbol if symbol else "N/A"
+        symbol_to_ids.setdefault(s, set()).add(token_id)
+        
+        # Обрабатываем синонимы токенов
+        normalized = self.__class__._token_synonyms.get(s)
+        if normalized is not None:
+            symbol_to_ids.setdefault(normalized, set()).add(token_id)
+        
+        # Обрабатываем обратные синонимы
+        for syn in self.__class__._reverse_synonyms.get(s, ()):
+            symbol_to_ids.setdefault(syn, set()).add(token_id)
+    
+    def _set_cex_keywords(self):
+        """Подготавливает ключевые слова CEX фильтра (строка или список) в нижнем регистре."""
+        keyword = self.config.get('target_entity_keyword')
+        keywords = [keyword] if isinstance(keyword, str) else (keyword or [])
+        self._cex_keywords_lc = tuple(k.casefold() for k in keywords if k)
+        # {entity_type: bool} - типов сущностей мало, результат проверки считаем один раз на тип
+        self._cex_type_matches = {}
+    
+    def _track_cex_address(self, identifier, entity_type):
+        """Добавляет адрес в список CEX, если тип сущности содержит ключевое слово."""
+        if not self._cex_keywords_lc or not isinstance(entity_type, str):
+            return
+        matches = self._cex_type_matches.get(entity_type)
+        if matches is None:
+            type_lc = entity_type.casefold()
+            matches = self._cex_type_matches[entity_type] = any(k in type_lc for k in self._cex_keywords_lc)
+        if matches:
+            self._cex_addresses.add(identifier)
     
     def _update_cex_addresses(self):
-        """Обновляет список адресов CEX для фильтрации."""
+        """Полностью пересобирает список адресов CEX для фильтрации (при инициализации и после изменений общего кеша)."""
         self._cex_addresses = set()
-        keyword = self.config.get('target_entity_keyword', '')
+        self._cex_synced_version = _shared_address_cache_version
         
-        if not keyword:
+        if not self._cex_keywords_lc:
             return
-            
-        keyword = keyword.lower() if keyword else ''
         
         for identifier, entry in self._address_cache.items():
-            # Проверяем, не None ли тип
-            entity_type = entry.get('type')
-            if entity_type is not None:
-                entity_type = entity_type.lower()
-                # Проверяем содержит ли тип сущности ключевое слово (например, 'cex')
-                if keyword and keyword in entity_type:
-                    self._cex_addresses.add(identifier)
+            # Проверяем содержит ли тип сущности ключевое слово (например, 'cex')
+            self._track_cex_address(identifier, entry.type)
     
     def _build_token_filter(self):
         """
@@ -612,36 +944,26 @@ class ArkhamMonitor:
             symbol_to_ids = self.__class__._global_symbol_to_ids
         
         # Выводим отладочную информацию (только в _build_token_filter, без дублирования)
-        self.logger.info(f"Размер кеша токенов в тесте: {len(self._token_cache) if not self.shared_cache else len(self.__class__._global_token_cache)}")
-        self.logger.info(f"Маппинг символ->ID: {symbol_to_ids}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Размер кеша токенов в тесте: %d", len(self._token_cache) if not self.shared_cache else len(self.__class__._global_token_cache))
+            self.logger.debug("Маппинг символ->ID: %s", symbol_to_ids)
         
-        # Нормализуем target_symbols к стандартным именам из _token_synonyms
-        normalized_symbols = []
-        for sym in target_symbols:
-            normalized = self.__class__._token_synonyms.get(sym, sym)
-            normalized_symbols.append(normalized)
-            
-            # Добавим также оригинальный символ, если он отличается от нормализованного
-            if normalized != sym:
-                normalized_symbols.append(sym)
-        
-        for target_symbol in normalized_symbols:
+        for target_symbol in self._normalized_target_symbols:
             ids_for_target = symbol_to_ids.get(target_symbol)
             if ids_for_target:
-                self.logger.info(f"Найдены ID ({len(ids_for_target)} шт) для символа '{target_symbol}': {ids_for_target}")
+                self.logger.info("Найдены ID (%d шт) для символа '%s': %s", len(ids_for_target), target_symbol, ids_for_target)
                 all_target_token_ids.update(ids_for_target)
                 found_any_id = True
             else:
-                self.logger.warning(f"Символ '{target_symbol}' не найден в кэше токенов.")
+                self.logger.warning("Символ '%s' не найден в кэше токенов.", target_symbol)
         
         if found_any_id:
-            # Приводим все ID к нижнему регистру перед объединением
-            lowercase_ids = [tid.lower() for tid in all_target_token_ids]
-            token_filter = ",".join(sorted(list(lowercase_ids)))
-            self.logger.info(f"Итоговый фильтр 'tokens' ({len(all_target_token_ids)} ID, lowercase): {token_filter}")
+            # ID уже в нижнем регистре (см. _update_caches)
+            token_filter = ",".join(sorted(all_target_token_ids))
+            self.logger.info("Итоговый фильтр 'tokens' (%d ID, lowercase): %s", len(all_target_token_ids), token_filter)
             return token_filter
         
-        self.logger.warning(f"Не найдено ID ни для одного из целевых символов: {target_symbols}. Фильтр 'tokens' не будет применен.")
+        self.logger.warning("Не найдено ID ни для одного из целевых символов: %s. Фильтр 'tokens' не будет применен.", target_symbols)
         return None
     
     def _build_cex_filter(self):
@@ -656,7 +978,7 @@ class ArkhamMonitor:
             
         # Ограничиваем количество адресов в фильтре, чтобы не превысить лимиты API
         max_addresses = 10  # Можно настроить в зависимости от ограничений API
-        addresses_to_use = list(self._cex_addresses)[:max_addresses]
+        addresses_to_use = list(islice(self._cex_addresses, max_addresses))
         
         if addresses_to_use:
             cex_filter = ",".join(addresses_to_use)
@@ -672,7 +994,7 @@ class ArkhamMonitor:
         Returns:
             bool: True если данные получены успешно, иначе False
         """
-        self.logger.info(f"Инициализация кеша по данным API...")
+        self.logger.info("Инициализация кеша по данным API...")
         
         initial_params = {
             'timeLast': self.config.get('initial_lookback'),
@@ -681,34 +1003,46 @@ class ArkhamMonitor:
         }
         
         try:
-            initial_data = self._get_transfers(params=initial_params)
-            
-            if initial_data and isinstance(initial_data.get('transfers'), list):
-                self.logger.info(f"Получено {len(initial_data['transfers'])} транзакций для инициализации.")
-                
-                # Обработка и обновление кеша (вызов _update_caches уже обновляет маппинг)
-                processed_initial = [self._preprocess_transaction(tx) for tx in initial_data['transfers']]
-                valid_processed_initial = [tx for tx in processed_initial if tx]
-                self._update_caches(valid_processed_initial)
-                
-                # После обновления кеша покажем информацию один раз
-                self._update_symbol_to_ids_map(verbose=True)
-                
-                self.logger.info(f"Кеш инициализирован. Найдено {len(self._address_cache)} адресов/сущностей и {len(self._token_cache)} токенов.")
-                
-                # Показываем информацию о токенах только один раз
-                token_values = list(self._token_cache.values()) if not self.shared_cache else list(self.__class__._global_token_cache.values())
-                self.logger.info(f"Токены в кеше: {token_values}")
+            stream_min_limit = self.config.get('stream_min_limit')
+            if ijson is not None and stream_min_limit and (initial_params['limit'] or 0) >= stream_min_limit:
+                # Большой ответ: обработка транзакций идет параллельно с чтением из сокета
+                valid_processed_initial = [tx for tx in self._get_transfers_stream(params=initial_params) if tx]
+                self.logger.info("Получено %s транзакций для инициализации (потоково).", len(valid_processed_initial))
+            else:
+                n_chunks = self.config.get('initial_chunks') or 1
+                if n_chunks > 1:
+                    initial_data = self._get_transfers_chunked(
+                        initial_params['timeLast'], initial_params['usdGte'], initial_params['limit'], n_chunks=n_chunks
+                    )
+                else:
+                    initial_data = self._get_transfers(params=initial_params)
                 
-                return True
+                if not initial_data or not isinstance(initial_data.get('transfers'), list):
+                    self.logger.warning("Не удалось получить данные для инициализации кеша.")
+                    return False
                 
-            else:
-                self.logger.warning("Не удалось получить данные для инициализации кеша.")
+                self.logger.info("Получено %s транзакций для инициализации.", len(initial_data['transfers']))
+                valid_processed_initial = self._preprocess_batch(initial_data['transfers'])
+            
+            # Обновление кеша (вызов _update_caches уже обновляет маппинг)
+            self._update_caches(valid_processed_initial)
+            
+            # После обновления кеша покажем информацию один раз
+            self._update_symbol_to_ids_map(verbose=True)
+            
+            self.logger.info("Кеш инициализирован. Найдено %s адресов/сущностей и %s токенов.", len(self._address_cache), len(self._token_cache))
+            
+            # Показываем информацию о токенах только один раз
+            if self.logger.isEnabledFor(logging.INFO):
+                token_cache = self.__class__._global_token_cache if self.shared_cache else self._token_cache
+                self.logger.info("Токены в кеше: %d", len(token_cache))
+            
+            return True
                 
         except self.ArkhamAPIError as e:
-            self.logger.error(f"Ошибка API при инициализации кеша: {e}")
+            self.logger.error("Ошибка API при инициализации кеша: %s", e)
         except Exception as e:
-            self.logger.exception(f"Непредвиденная ошибка при инициализации кеша: {e}")
+            self.logger.exception("Непредвиденная ошибка при инициализации кеша: %s", e)
             
         return False
     
@@ -722,6 +1056,8 @@ class ArkhamMonitor:
         Returns:
             pandas.DataFrame: DataFrame с транзакциями
         """
+        import pandas as pd
+        
         monitor_params = {
             'timeLast': self.config.get('monitor_lookback'),
             'usdGte': self.config.get('monitor_usd_gte'),
@@ -745,32 +1081,50 @@ class ArkhamMonitor:
             if data and isinstance(data.get('transfers'), list):
                 transfers = data['transfers']
                 api_count = data.get('count', len(transfers))
-                self.logger.info(f"Получено {len(transfers)} транзакций (API count: {api_count}). Обработка...")
+                self.logger.info("Получено %s транзакций (API count: %s). Обработка...", len(transfers), api_count)
                 
                 # Обработка транзакций и обновление кеша
-                processed_transfers = [self._preprocess_transaction(tx) for tx in transfers]
-                valid_processed_transfers = [tx for tx in processed_transfers if tx]
+                valid_processed_transfers = self._preprocess_batch(transfers)
                 
                 try:
                     self._update_caches(valid_processed_transfers)
                 except Exception as e:
-                    self.logger.error(f"Ошибка при обновлении кеша: {e}")
+                    self.logger.error("Ошибка при обновлении кеша: %s", e)
                 
                 if valid_processed_transfers:
-                    df = pd.DataFrame(valid_processed_transfers)
-                    df['Details'] = df['_raw_data']  # Добавляем колонку Details
-                    return df
+                    # Сырые данные API не кладем в DataFrame (объектная колонка раздувает каждую строку),
+                    # а храним отдельно для просмотра деталей по TxID
+                    self._raw_by_txid = {tx['TxID']: tx['_raw_data'] for tx in valid_processed_transfers}
+                    
+                    # Собираем DataFrame по колонкам: все обработанные записи имеют одинаковый набор ключей
+                    columns = {
+                        key: [tx.get(key) for tx in valid_processed_transfers]
+                        for key in valid_processed_transfers[0] if key != '_raw_data'
+                    }
+                    return pd.DataFrame(columns, copy=False)
                     
             else:
                 self.logger.warning("Не удалось получить данные от API или ответ не содержит список 'transfers'.")
                 
         except self.ArkhamAPIError as e:
-            self.logger.error(f"Ошибка API в запросе транзакций: {e}")
+            self.logger.error("Ошибка API в запросе транзакций: %s", e)
         except Exception as e:
-            self.logger.exception(f"Непредвиденная ошибка в запросе транзакций: {e}")
+            self.logger.exception("Непредвиденная ошибка в запросе транзакций: %s", e)
             
         return None
     
+    def get_transaction_details(self, txid):
+        """
+        Возвращает сырые данные транзакции из последнего вызова get_transactions.
+        
+        Args:
+            txid (str): Значение колонки TxID
+            
+        Returns:
+            dict: Данные транзакции от API или None
+        """
+        return self._raw_by_txid.get(txid)
+    
     def get_tokens_dataframe(self):
         """
         Возвращает DataFrame с данными о токенах.
@@ -778,6 +1132,8 @@ class ArkhamMonitor:
         Returns:
             pandas.DataFrame: DataFrame с токенами
         """
+        import pandas as pd
+        
         token_data = []
         
         for token_id, symbol in self._token_cache.items():
@@ -788,8 +1144,9 @@ class ArkhamMonitor:
         
         if token_data:
             df = pd.DataFrame(token_data)
-            # Агрегация по символу
-            symbol_counts = df.groupby('Символ').size().reset_index(name='Количество ID')
+            # Агрегация по символу через Counter (без groupby по object-колонке)
+            symbol_cnt = Counter(row['Символ'] for row in token_data)
+            symbol_counts = pd.DataFrame(sorted(symbol_cnt.items()), columns=['Символ', 'Количество ID'])
             return df, symbol_counts
         
         return pd.DataFrame(), pd.DataFrame()
@@ -801,22 +1158,26 @@ class ArkhamMonitor:
         Returns:
             pandas.DataFrame: DataFrame с сущностями
         """
+        import pandas as pd
+        
         entity_data = []
+        type_cnt = Counter()
+        real_cnt = Counter()
         
         for identifier, entry in self._address_cache.items():
-            entity_data.append({
-                'Идентификатор': identifier,
-                'Имя': entry.get('name', 'N/A'),
-                'Тип': entry.get('type', 'N/A'),
-                'Реальное имя': entry.get('is_real', False)
-            })
+            # Строка-кортеж (идентификатор, имя, тип, is_real) вместо словаря на каждую запись
+            entity_data.append((identifier, *entry))
+            # Агрегация по типу и по флагу реального имени в том же проходе
+            # (None пропускаем, как и groupby по умолчанию)
+            if entry.type is not None:
+                type_cnt[entry.type] += 1
+            if entry.is_real is not None:
+                real_cnt[entry.is_real] += 1
         
         if entity_data:
-            df = pd.DataFrame(entity_data)
-            # Агрегация по типу
-            type_counts = df.groupby('Тип').size().reset_index(name='Количество')
-            # Агрегация по флагу реального имени
-            real_name_counts = df.groupby('Реальное имя').size().reset_index(name='Количество')
+            df = pd.DataFrame(entity_data, columns=['Идентификатор', 'Имя', 'Тип', 'Реальное имя'])
+            type_counts = pd.DataFrame(sorted(type_cnt.items()), columns=['Тип', 'Количество'])
+            real_name_counts = pd.DataFrame(sorted(real_cnt.items()), columns=['Реальное имя', 'Количество'])
             return df, type_counts, real_name_counts
         
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
@@ -831,15 +1192,17 @@ class ArkhamMonitor:
         Note:
             Блокирующий метод, выполняется до прерывания пользователем.
         """
+        import pandas as pd
+        
         if interval is None:
             interval = self.config.get('poll_interval_seconds')
             
-        self.logger.info(f"Запуск мониторинга с интервалом {interval} секунд...")
+        self.logger.info("Запуск мониторинга с интервалом %s секунд...", interval)
         
         try:
             while True:
                 current_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                self.logger.info(f"[{current_time}] Начинаем цикл обновления...")
+                self.logger.info("[%s] Начинаем цикл обновления...", current_time)
                 
                 df = self.get_transactions(use_filters=True)
                 
@@ -860,13 +1223,13 @@ class ArkhamMonitor:
                     
                     print("=" * 50 + "\n")
                 
-                self.logger.info(f"Ожидание {interval} секунд перед следующим обновлением...")
+                self.logger.info("Ожидание %s секунд перед следующим обновлением...", interval)
                 time.sleep(interval)
                 
         except KeyboardInterrupt:
             self.logger.info("Мониторинг остановлен пользователем.")
         except Exception as e:
-            self.logger.exception(f"Непредвиденная ошибка в цикле мониторинга: {e}")
+            self.logger.exception("Непредвиденная ошибка в цикле мониторинга: %s", e)
     
     # Определение кастомного класса ошибки
     class ArkhamAPIError(Exception):
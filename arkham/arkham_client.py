@@ -1,9 +1,54 @@
 import requests
 import json
+import logging
+import re
+
+try:
+    import orjson # C parser over raw bytes; its JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:
+    orjson = None
+try:
+    import ijson
+except ImportError: # Optional dependency: pip install arkham_client[stream]
+    ijson = None
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING # gzip,deflate plus br/zstd when their decoders are installed
 from .config import BASE_API_URL, DEFAULT_REQUEST_TIMEOUT, ArkhamAPIError, get_logger
 
 logger = get_logger(__name__)
 
+NOT_MODIFIED = object() # Returned by ArkhamClient when the server answers 304 to a conditional GET
+
+# Integer literal of 19+ digits: orjson reads integers beyond 64 bits as floats, stdlib json keeps them exact
+_BIG_INT_RE = re.compile(rb'[:,\[]\s*-?\d{19,}\s*[,\]}]')
+
+def json_loads(content: bytes):
+    """Parses a JSON response body with orjson when installed, keeping stdlib json results.
+
+    Falls back to json.loads for bodies orjson would read differently: NaN/Infinity literals
+    (orjson rejects them) and integers beyond 64 bits (orjson turns them into floats).
+    Raises json.JSONDecodeError for invalid JSON in both cases.
+    """
+    if orjson is not None and not _BIG_INT_RE.search(content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass # stdlib json either accepts it (NaN, Infinity) or raises the same error type
+    return json.loads(content)
+
+def http_status_error(status_code: int, response_text: str) -> ArkhamAPIError:
+    """Maps an HTTP error status and response body to an ArkhamAPIError (shared by sync and async clients)."""
+    if status_code == 401:
+        return ArkhamAPIError(message="Ошибка авторизации (401 Unauthorized). Проверьте API ключ.", status_code=status_code)
+    elif status_code == 403:
+        # Basic rate limit check
+        if 'throttled' in response_text.lower() or 'rate limit' in response_text.lower():
+            return ArkhamAPIError(message="Превышен лимит запросов Arkham API (403 Forbidden/Throttled).", status_code=status_code)
+        return ArkhamAPIError(message=f"Доступ запрещен (403 Forbidden). Ответ: {response_text}", status_code=status_code)
+    # General HTTP error
+    return ArkhamAPIError(message=f"HTTP Error: {status_code}. Ответ: {response_text}", status_code=status_code)
+
 class ArkhamClient:
     """Handles communication with the Arkham Intelligence API."""
 
@@ -15,51 +60,77 @@ class ArkhamClient:
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
         self.headers = {"API-Key": self.api_key}
+        self._endpoint_cache: dict[str, str] = {} # endpoint -> full URL
 
-    def _request(self, endpoint: str, params: dict | None = None):
-        """Makes a request to the specified API endpoint."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        request_params = params or {}
+        # Pooled keep-alive session: avoids a new TCP/TLS handshake on every poll
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Advertise every encoding urllib3 can decode here, so large JSON responses can come brotli/zstd-compressed
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(500, 502, 503, 504),
+                raise_on_status=False # Final response goes through raise_for_status below
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
-        logger.debug(f"Запрос к Arkham API: URL={url}, Params={request_params}")
+    def _request(self, endpoint: str, params: dict | None = None, etag: str | None = None) -> tuple:
+        """Makes a request to the specified API endpoint.
+
+        Returns (parsed body, ETag header of the response or None). A given etag is sent as
+        If-None-Match; if the server answers 304, (NOT_MODIFIED, etag) is returned instead of a body.
+        The client keeps no ETag state: callers pair ETags with the results they hold.
+        """
+        url = self._url(endpoint)
+        logger.debug("Запрос к Arkham API: URL=%s, Params=%s", url, params)
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
-                headers=self.headers,
-                params=request_params,
+                params=params, # requests accepts None
+                headers={"If-None-Match": etag} if etag else None,
                 timeout=DEFAULT_REQUEST_TIMEOUT
             )
             response.raise_for_status()  # Raises HTTPError for bad responses (4xx or 5xx)
 
-            logger.debug(f"Arkham API ответил статусом {response.status_code}")
+            logger.debug("Arkham API ответил статусом %s", response.status_code)
+            if response.status_code == 304 and etag:
+                return NOT_MODIFIED, etag
             
             try:
-                return response.json()
+                data = json_loads(response.content)
             except json.JSONDecodeError as json_err:
-                logger.error(f"Ошибка декодирования JSON от Arkham API: {json_err}. Ответ: {response.text[:500]}")
+                if logger.isEnabledFor(logging.ERROR): # response.text decodes the whole body
+                    logger.error("Ошибка декодирования JSON от Arkham API: %s. Ответ: %s", json_err, response.text[:500])
                 raise ArkhamAPIError(message=f"JSON Decode Error: {json_err}", status_code=response.status_code if response else None) from json_err
-
-        except requests.exceptions.HTTPError as http_err:
-            status_code = http_err.response.status_code
-            response_text = http_err.response.text[:500] if http_err.response else "<no response text>"
-            logger.error(f"HTTP ошибка {status_code} при запросе к {url}: {response_text}")
-            
-            if status_code == 401:
-                raise ArkhamAPIError(message="Ошибка авторизации (401 Unauthorized). Проверьте API ключ.", status_code=status_code) from http_err
-            elif status_code == 403:
-                 # Basic rate limit check
-                if 'throttled' in response_text.lower() or 'rate limit' in response_text.lower():
-                    raise ArkhamAPIError(message="Превышен лимит запросов Arkham API (403 Forbidden/Throttled).", status_code=status_code) from http_err
-                raise ArkhamAPIError(message=f"Доступ запрещен (403 Forbidden). Ответ: {response_text}", status_code=status_code) from http_err
-            else:
-                 # General HTTP error
-                raise ArkhamAPIError(message=f"HTTP Error: {status_code}. Ответ: {response_text}", status_code=status_code) from http_err
+            return data, response.headers.get('ETag')
 
         except requests.exceptions.RequestException as req_err:
-            # Network errors, timeouts, etc.
-            logger.error(f"Ошибка соединения с Arkham API ({url}): {req_err}")
-            raise ArkhamAPIError(message=f"Ошибка соединения: {req_err}", status_code=None) from req_err
+            raise self._request_error(url, req_err) from req_err
+
+    def _url(self, endpoint: str) -> str:
+        url = self._endpoint_cache.get(endpoint)
+        if url is None:
+            url = self._endpoint_cache[endpoint] = f"{self.base_url}/{endpoint.lstrip('/')}"
+        return url
+
+    @staticmethod
+    def _request_error(url: str, req_err: requests.exceptions.RequestException) -> ArkhamAPIError:
+        """Logs a failed request and maps it to ArkhamAPIError."""
+        if isinstance(req_err, requests.exceptions.HTTPError):
+            status_code = req_err.response.status_code
+            response_text = req_err.response.text[:500] if req_err.response else "<no response text>"
+            logger.error("HTTP ошибка %s при запросе к %s: %s", status_code, url, response_text)
+            return http_status_error(status_code, response_text)
+        # Network errors, timeouts, etc.
+        logger.error("Ошибка соединения с Arkham API (%s): %s", url, req_err)
+        return ArkhamAPIError(message=f"Ошибка соединения: {req_err}", status_code=None)
 
     def get_transfers(self, params: dict | None = None):
         """Fetches transfers from the Arkham API.
@@ -73,4 +144,51 @@ class ArkhamClient:
         Raises:
             ArkhamAPIError: If an API or network error occurs.
         """
-        return self._request('transfers', params=params) 
\ No newline at end of file
+        return self._request('transfers', params=params)[0]
+
+    def get_transfers_conditional(self, params: dict | None = None, etag: str | None = None) -> tuple:
+        """Fetches transfers, revalidating a previous result by its ETag.
+
+        Args:
+            params: Dictionary of query parameters for the /transfers endpoint.
+            etag: ETag returned with the caller's previous result for the *same* params, or None.
+
+        Returns:
+            (response dict, ETag or None), or (NOT_MODIFIED, etag) if the server reports that
+            the result for that ETag has not changed.
+
+        Raises:
+            ArkhamAPIError: If an API or network error occurs.
+        """
+        return self._request('transfers', params=params, etag=etag)
+
+    def iter_transfers(self, params: dict | None = None):
+        """Yields transfers from the /transfers endpoint one at a time.
+
+        With ijson installed (extra `stream`) the response is parsed incrementally while it is being
+        downloaded, so the full response tree is never built; without it this falls back to
+        get_transfers(). Numbers are yielded as floats/ints, as with get_transfers().
+
+        Raises:
+            ArkhamAPIError: If an API or network error occurs (possibly after some transfers were yielded).
+        """
+        if ijson is None:
+            yield from (self.get_transfers(params) or {}).get('transfers') or []
+            return
+
+        url = self._url('transfers')
+        logger.debug("Потоковый запрос к Arkham API: URL=%s, Params=%s", url, params)
+        try:
+            with self.session.get(url, params=params, stream=True, timeout=DEFAULT_REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True # ijson reads the raw stream: let urllib3 undo gzip
+                yield from ijson.items(response.raw, 'transfers.item', use_float=True)
+        except requests.exceptions.RequestException as req_err:
+            raise self._request_error(url, req_err) from req_err
+        except ijson.JSONError as json_err:
+            logger.error("Ошибка потокового разбора JSON от Arkham API: %s", json_err)
+            raise ArkhamAPIError(message=f"JSON Decode Error: {json_err}", status_code=None) from json_err
+
+    def close(self):
+        """Closes pooled connections. The client stays usable; new connections are opened on demand."""
+        self.session.close()
\ No newline at end of file
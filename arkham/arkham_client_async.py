@@ -0,0 +1,96 @@
+import json
+import logging
+
+try:
+    import httpx
+except ImportError: # Optional dependency: pip install arkham_client[async]
+    httpx = None
+
+try:
+    import h2 # noqa: F401 - HTTP/2 support for httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from .config import BASE_API_URL, DEFAULT_REQUEST_TIMEOUT, ArkhamAPIError, get_logger
+from .arkham_client import http_status_error, json_loads
+
+logger = get_logger(__name__)
+
+class AsyncArkhamClient:
+    """Asynchronous client for the Arkham Intelligence API (httpx, HTTP/2 when available).
+
+    Lets several queries share one multiplexed connection, e.g. via asyncio.gather.
+    Use as an async context manager or call aclose() when done.
+    """
+
+    def __init__(self, api_key: str, base_url: str = BASE_API_URL, http2: bool = True):
+        if httpx is None:
+            raise ImportError("Для AsyncArkhamClient требуется httpx: pip install arkham_client[async]")
+        if not api_key or api_key == 'YOUR_API_KEY_HERE':
+            logger.error("API ключ Arkham не предоставлен или некорректен.")
+            raise ValueError("API ключ не найден или некорректен")
+
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.headers = {"API-Key": self.api_key}
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=http2 and HTTP2_AVAILABLE,
+            timeout=DEFAULT_REQUEST_TIMEOUT
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _request(self, endpoint: str, params: dict | None = None):
+        """Makes a request to the specified API endpoint."""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        request_params = params or {}
+
+        logger.debug("Запрос к Arkham API (async): URL=%s, Params=%s", url, request_params)
+
+        try:
+            response = await self.client.get(url, params=request_params)
+            response.raise_for_status()
+
+            logger.debug("Arkham API ответил статусом %s", response.status_code)
+
+            try:
+                return json_loads(response.content)
+            except json.JSONDecodeError as json_err:
+                if logger.isEnabledFor(logging.ERROR): # response.text decodes the whole body
+                    logger.error("Ошибка декодирования JSON от Arkham API: %s. Ответ: %s", json_err, response.text[:500])
+                raise ArkhamAPIError(message=f"JSON Decode Error: {json_err}", status_code=response.status_code) from json_err
+
+        except httpx.HTTPStatusError as http_err:
+            status_code = http_err.response.status_code
+            response_text = http_err.response.text[:500]
+            logger.error("HTTP ошибка %s при запросе к %s: %s", status_code, url, response_text)
+            raise http_status_error(status_code, response_text) from http_err
+
+        except httpx.RequestError as req_err:
+            # Network errors, timeouts, etc.
+            logger.error("Ошибка соединения с Arkham API (%s): %s", url, req_err)
+            raise ArkhamAPIError(message=f"Ошибка соединения: {req_err}", status_code=None) from req_err
+
+    async def get_transfers(self, params: dict | None = None):
+        """Fetches transfers from the Arkham API.
+
+        Args:
+            params: Dictionary of query parameters for the /transfers endpoint.
+
+        Returns:
+            Dictionary containing the API response.
+
+        Raises:
+            ArkhamAPIError: If an API or network error occurs.
+        """
+        return await self._request('transfers', params=params)
+
+    async def aclose(self):
+        """Closes the underlying connection pool."""
+        await self.client.aclose()
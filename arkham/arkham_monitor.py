@@ -1,22 +1,29 @@
 import time
 import os
-import pandas as pd
 import threading
-from typing import Callable
+from typing import Callable, TYPE_CHECKING
 
 from dotenv import load_dotenv
 
 from .config import get_logger, ArkhamAPIError, BASE_API_URL
-from .arkham_client import ArkhamClient
-from .cache import AddressCache, TokenCache
-from .data_processor import DataProcessor
+from .arkham_client import ArkhamClient, NOT_MODIFIED
+from .cache import AddressCache, TokenCache, SeenTxidFilter
+from .data_processor import DataProcessor, ProcessedTx
 from .filter import TransactionFilter
 
+if TYPE_CHECKING:
+    import pandas as pd # Imported lazily in get_transactions: callback-only users never load pandas
+
 logger = get_logger(__name__)
 
+SEEN_TXIDS_CAPACITY = 100_000 # Transaction IDs per bloom generation used by the monitoring loop for deduplication
+
 class ArkhamMonitor:
     """Orchestrates fetching, processing, caching, and filtering Arkham transactions."""
 
+    # Columns exposed by get_transactions (TxID is appended when processed txs carry _txid)
+    _DISPLAY_COLUMNS = ("Время", "Сеть", "Откуда", "Куда", "Символ", "Кол-во", "USD")
+
     def __init__(self, 
                  api_key: str | None = None, 
                  api_base_url: str | None = None,
@@ -24,7 +31,8 @@ class ArkhamMonitor:
                  token_cache: TokenCache | None = None,
                  arkham_client: ArkhamClient | None = None,
                  data_processor: DataProcessor | None = None,
-                 transaction_filter: TransactionFilter | None = None):
+                 transaction_filter: TransactionFilter | None = None,
+                 seen_txids: SeenTxidFilter | None = None):
         """
         Initializes the monitor components. Dependencies (caches, client, processor, filter) 
         are created automatically if not provided.
@@ -37,6 +45,7 @@ class ArkhamMonitor:
             arkham_client: Optional ArkhamClient instance.
             data_processor: Optional DataProcessor instance.
             transaction_filter: Optional TransactionFilter instance.
+            seen_txids: Optional SeenTxidFilter of already delivered txids.
         """
         load_dotenv()
         effective_api_key = api_key or os.getenv('ARKHAM_API_KEY')
@@ -49,16 +58,23 @@ class ArkhamMonitor:
         self.address_cache = address_cache or AddressCache()
         self.token_cache = token_cache or TokenCache()
         self.client = arkham_client or ArkhamClient(api_key=effective_api_key, base_url=effective_base_url)
+        self._own_client = None if arkham_client else self.client # only a client created here is closed by stop
         # Ensure processor and filter use the *same* cache instances
         self.processor = data_processor or DataProcessor(self.address_cache, self.token_cache)
         self.filter = transaction_filter or TransactionFilter(self.address_cache, self.token_cache)
+        self.seen_txids = seen_txids or SeenTxidFilter(capacity=SEEN_TXIDS_CAPACITY)
         # -----------------------------------------------------
 
-        self._last_processed_transactions: list[dict] = []
+        # (frozenset(api params), ETag, processed txs) of the last successful fetch; written as one tuple
+        # under the lock, so a 304 always resolves to the list that belongs to the revalidated ETag
+        self._last_poll: tuple[frozenset, str | None, list[ProcessedTx]] | None = None
+        self._poll_lock = threading.Lock()
+        # {frozenset(processed tx keys): (display columns present, has _txid)}
+        self._actual_columns_cache: dict[frozenset, tuple[tuple[str, ...], bool]] = {}
         self._monitor_thread: threading.Thread | None = None
         self._stop_monitor_flag = threading.Event()
         
-        logger.info(f"Arkham Monitor инициализирован. API URL: {effective_base_url}")
+        logger.info("Arkham Monitor инициализирован. API URL: %s", effective_base_url)
 
     def initialize_cache(self, lookback: str = '1d', usd_gte: float = 100000, limit: int = 100) -> bool:
         """Performs an initial fetch to populate the caches.
@@ -71,7 +87,7 @@ class ArkhamMonitor:
         Returns:
             True if successful, False otherwise.
         """
-        logger.info(f"Инициализация кеша: lookback={lookback}, usd_gte={usd_gte}, limit={limit}")
+        logger.info("Инициализация кеша: lookback=%s, usd_gte=%s, limit=%s", lookback, usd_gte, limit)
         params = {
             'timeLast': lookback,
             'usdGte': int(usd_gte) if usd_gte == int(usd_gte) else str(usd_gte),
@@ -80,13 +96,13 @@ class ArkhamMonitor:
         try:
             api_response = self.client.get_transfers(params=params)
             self.processor.process_transactions_response(api_response) # Updates caches internally
-            logger.info(f"Кеш инициализирован. Адресов: {len(self.address_cache.get_all_names())}, Токенов: {len(self.token_cache.get_all_symbols())}")
+            logger.info("Кеш инициализирован. Адресов: %s, Токенов: %s", len(self.address_cache.get_all_names()), len(self.token_cache.get_all_symbols()))
             return True
         except ArkhamAPIError as e:
-            logger.error(f"Ошибка API при инициализации кеша: {e}")
+            logger.error("Ошибка API при инициализации кеша: %s", e)
             return False
         except Exception as e:
-            logger.exception(f"Непредвиденная ошибка при инициализации кеша: {e}")
+            logger.exception("Непредвиденная ошибка при инициализации кеша: %s", e)
             return False
 
     def set_filters(
@@ -116,29 +132,56 @@ class ArkhamMonitor:
         
     def get_token_symbol_map(self) -> dict[str, set[str]]:
         """Returns a dictionary mapping token symbols to their known IDs."""
-        return self.token_cache.get_symbol_to_ids_map()
+        # Снимок, а не живое представление: фоновый мониторинг обновляет кеш, пока вызывающий итерирует результат
+        return self.token_cache.get_symbol_to_ids_map().deep_copy()
 
-    def _fetch_and_process(self, limit: int = 100) -> list[dict]:
+    def _fetch_and_process(self, limit: int = 100) -> list[ProcessedTx]:
         """Internal method to fetch, process, and update caches.
            Returns the list of *all* processed transactions from the fetch.
         """
         api_params = self.filter.get_api_params(limit=limit)
         try:
-            logger.debug(f"Запрос транзакций с параметрами: {api_params}")
-            api_response = self.client.get_transfers(params=api_params)
+            logger.debug("Запрос транзакций с параметрами: %s", api_params)
+            params_key = frozenset(api_params.items())
+            with self._poll_lock:
+                last_poll = self._last_poll
+            get_conditional = getattr(self.client, 'get_transfers_conditional', None)
+            if get_conditional is None: # Клиент без поддержки ETag (например, подмененный в тестах)
+                api_response, etag = self.client.get_transfers(params=api_params), None
+            else:
+                # ETag действителен только для тех же параметров запроса
+                last_etag = last_poll[1] if last_poll and last_poll[0] == params_key else None
+                api_response, etag = get_conditional(params=api_params, etag=last_etag)
+            if api_response is NOT_MODIFIED:
+                # 304: ничего не изменилось с прошлого опроса - без разбора JSON и обновления кешей
+                logger.debug("Arkham API: данные не изменились (304).")
+                return last_poll[2]
             # Process response updates caches via self.processor
-            self._last_processed_transactions = self.processor.process_transactions_response(api_response)
-            return self._last_processed_transactions
+            processed = self.processor.process_transactions_response(api_response)
+            with self._poll_lock:
+                self._last_poll = (params_key, etag, processed) if etag else None
+            return processed
         except ArkhamAPIError as e:
-            logger.error(f"Ошибка API при получении транзакций: {e}")
-            self._last_processed_transactions = [] # Clear on error
-            return []
+            logger.error("Ошибка API при получении транзакций: %s", e)
         except Exception as e:
-            logger.exception(f"Непредвиденная ошибка при получении транзакций: {e}")
-            self._last_processed_transactions = []
-            return []
+            logger.exception("Непредвиденная ошибка при получении транзакций: %s", e)
+        with self._poll_lock:
+            self._last_poll = None # Clear on error: a later 304 must not resolve to stale data
+        return []
+
+    def get_processed_transactions(self, limit: int = 100) -> list[ProcessedTx]:
+        """Fetches transactions based on current filters and returns them as ProcessedTx records, without pandas.
+
+        Args:
+            limit: Max number of transactions to fetch from the API.
+
+        Returns:
+            A new list of ProcessedTx (empty when there is no data or on error).
+        """
+        # Копия: тот же список переиспользуется при ответе 304
+        return list(self._fetch_and_process(limit=limit))
 
-    def get_transactions(self, limit: int = 100) -> pd.DataFrame:
+    def get_transactions(self, limit: int = 100) -> "pd.DataFrame":
         """Fetches transactions based on current filters and returns them as a DataFrame.
         
         Args:
@@ -147,6 +190,8 @@ class ArkhamMonitor:
         Returns:
             A pandas DataFrame containing filtered transactions, or an empty DataFrame.
         """
+        import pandas as pd
+
         processed_txs = self._fetch_and_process(limit=limit)
         
         # Apply filters
@@ -155,32 +200,41 @@ class ArkhamMonitor:
         filtered_txs = processed_txs 
         
         count = len(filtered_txs)
-        logger.info(f"Найдено {count} транзакций после применения фильтров.")
+        logger.info("Найдено %s транзакций после применения фильтров.", count)
         
         if not filtered_txs:
             return pd.DataFrame() # Return empty DataFrame
 
         # --- Create DataFrame (select columns for display) ---
-        display_columns = ["Время", "Сеть", "Откуда", "Куда", "Символ", "Кол-во", "USD"]
-        # Добавляем колонку с хешем транзакции
-        if filtered_txs and '_txid' in filtered_txs[0]:
-            display_columns.append('TxID') 
-            # Переименовываем _txid в TxID для отображения
-            for tx in filtered_txs:
-                tx['TxID'] = tx.get('_txid', 'N/A')
-                
-        # Create DF from the list of dicts, selecting only necessary columns
-        # Убедимся, что выбираем только существующие колонки, особенно если TxID не добавилась
-        actual_columns = [col for col in display_columns if col in filtered_txs[0]] if filtered_txs else []
-        df = pd.DataFrame(filtered_txs)[actual_columns]
+        # Убедимся, что выбираем только существующие колонки (набор ключей у обработанных транзакций постоянный)
+        first_tx = filtered_txs[0]
+        key = frozenset(first_tx)
+        cached = self._actual_columns_cache.get(key)
+        if cached is None:
+            cached = self._actual_columns_cache[key] = (
+                tuple(col for col in self._DISPLAY_COLUMNS if col in first_tx),
+                '_txid' in first_tx
+            )
+        display_columns, has_txid = cached
+        
+        # Собираем DataFrame по колонкам (dict of lists), минуя построчное транспонирование списка словарей
+        columns = {col: [tx.get(col) for tx in filtered_txs] for col in display_columns}
+        # Добавляем колонку с хешем транзакции (_txid -> TxID), не изменяя исходные словари
+        if has_txid:
+            columns['TxID'] = [tx.get('_txid', 'N/A') for tx in filtered_txs]
+        actual_columns = list(columns)
+        df = pd.DataFrame(columns, columns=actual_columns, copy=False)
         return df
         # ------------------------------------------------------
 
     # --- Background Monitoring --- 
-    def _monitoring_loop(self, interval_seconds: int, callback: Callable[[dict], None]):
+    def _monitoring_loop(self, interval_seconds: int, callback: Callable[[ProcessedTx], None] | None):
         """The actual loop running in the background thread."""
-        logger.info(f"Запуск фонового мониторинга с интервалом {interval_seconds} сек.")
-        processed_ids_in_last_batch = set()
+        logger.info("Запуск фонового мониторинга с интервалом %s сек.", interval_seconds)
+        # Дедупликация через self.seen_txids (bloom filter): фиксированная память, переживает перезапуск
+        # вместе с get_full_cache_state()/load_full_cache_state()
+        # Опросы привязаны к сетке дедлайнов, а не к "интервал после окончания опроса", чтобы не было дрейфа
+        next_tick = time.monotonic()
 
         while not self._stop_monitor_flag.is_set():
             start_time = time.monotonic()
@@ -188,53 +242,52 @@ class ArkhamMonitor:
             
             # Fetch latest transactions
             current_processed_txs = self._fetch_and_process(limit=self.filter.get_api_params().get('limit', 100))
-            newly_processed_ids = {tx.get('_raw_data', {}).get('txid') for tx in current_processed_txs}
-            newly_processed_ids.discard(None) # Remove None IDs
             
-            new_transactions_count = 0
-            if current_processed_txs:
-                # Apply filters
-                # filtered_txs = [tx for tx in current_processed_txs if self.filter.matches(tx)] # Убрано локальное применение фильтров
-                # Полагаемся на фильтрацию API, обрабатываем все полученные транзакции как релевантные (если новые)
-                filtered_txs = current_processed_txs 
-                
-                # Identify transactions not seen in the *previous* exact batch 
-                # (simple check, might miss things if tx appears across batches with lookback)
-                # A more robust approach would track IDs over time or use timestamps.
-                current_batch_filtered_ids = {tx.get('_raw_data', {}).get('txid') for tx in filtered_txs}
-                current_batch_filtered_ids.discard(None)
-                
-                truly_new_ids = current_batch_filtered_ids - processed_ids_in_last_batch
-                
-                if truly_new_ids:
-                    for tx in filtered_txs:
-                        txid = tx.get('_raw_data', {}).get('txid')
-                        if txid in truly_new_ids:
-                             try:
-                                 callback(tx) # Call user callback for new, filtered transactions
-                                 new_transactions_count += 1
-                             except Exception as e:
-                                 logger.exception(f"Ошибка в callback-функции мониторинга: {e}")
+            # Пустой ответ (или отсутствие callback) - нечего дедуплицировать, сразу к ожиданию
+            if current_processed_txs and callback is not None:
+                # Полагаемся на фильтрацию API: все полученные транзакции релевантны (если новые).
+                # Один проход строит {txid: tx} (дубликаты внутри пачки схлопываются); новые - те, что еще не в фильтре
+                batch = {
+                    txid: tx for tx in current_processed_txs
+                    if (txid := tx.txid) and txid != "N/A" # _txid заполняет DataProcessor (официальный или сгенерированный)
+                }
+            
+                new_transactions_count = 0
+                for txid, tx in batch.items(): # dict сохраняет порядок ответа API
+                    if not self.seen_txids.add(txid):
+                        continue
+                    try:
+                        callback(tx) # Call user callback for new, filtered transactions
+                        new_transactions_count += 1
+                    except Exception as e:
+                        logger.exception("Ошибка в callback-функции мониторинга: %s", e)
             
-            processed_ids_in_last_batch = newly_processed_ids # Update seen IDs for next iteration
-            if new_transactions_count > 0:
-                logger.info(f"Обнаружено {new_transactions_count} новых транзакций по фильтрам.")
-                
-            # Wait for the next interval
-            elapsed_time = time.monotonic() - start_time
-            wait_time = max(0, interval_seconds - elapsed_time)
-            logger.debug(f"Цикл мониторинга завершен за {elapsed_time:.2f} сек. Ожидание {wait_time:.2f} сек.")
+                if new_transactions_count > 0:
+                    logger.info("Обнаружено %s новых транзакций по фильтрам.", new_transactions_count)
+
+            # Wait for the next deadline; если опрос затянулся дольше интервала, пропущенные тики не догоняем
+            next_tick += interval_seconds
+            now = time.monotonic()
+            elapsed_time = now - start_time
+            if interval_seconds <= 0:
+                next_tick = now # Интервал 0 - непрерывный опрос, пропущенных тиков нет
+            elif now > next_tick:
+                missed = int((now - next_tick) // interval_seconds) + 1
+                next_tick += missed * interval_seconds
+                logger.warning("Цикл мониторинга не уложился в интервал: пропущено тиков: %d", missed)
+            wait_time = max(0, next_tick - now)
+            logger.debug("Цикл мониторинга завершен за %.2f сек. Ожидание %.2f сек.", elapsed_time, wait_time)
             self._stop_monitor_flag.wait(wait_time)
             
         logger.info("Фоновый мониторинг остановлен.")
 
-    def start_background_monitoring(self, interval_seconds: int = 60, callback: Callable[[dict], None] = lambda tx: print(f"New TX: {tx.get('USD')}")):
+    def start_background_monitoring(self, interval_seconds: int = 60, callback: Callable[[ProcessedTx], None] = lambda tx: print(f"New TX: {tx.usd}")):
         """Starts monitoring transactions in a background thread.
 
         Args:
-            interval_seconds: How often to check for new transactions (in seconds).
+            interval_seconds: How often to check for new transactions (in seconds); 0 (or less) polls continuously.
             callback: A function to call when a new transaction matching filters is found. 
-                      The function will receive the processed transaction dictionary.
+                      The function will receive the ProcessedTx (also readable as a mapping with the former dict keys).
         """
         if self._monitor_thread and self._monitor_thread.is_alive():
             logger.warning("Мониторинг уже запущен.")
@@ -259,14 +312,18 @@ class ArkhamMonitor:
         self._monitor_thread.join(timeout=timeout)
         
         if self._monitor_thread.is_alive():
-            logger.warning(f"Поток мониторинга не завершился за {timeout} сек.")
+            logger.warning("Поток мониторинга не завершился за %s сек.", timeout)
         else:
             logger.info("Поток мониторинга успешно завершен.")
+            # Release idle keep-alive connections, but never close a client the caller passed in
+            close = getattr(self.client, 'close', None) if self.client is self._own_client else None
+            if close:
+                close()
         self._monitor_thread = None
 
     def get_full_cache_state(self) -> dict:
         """
-        Returns a serializable state of all caches (address and token).
+        Returns a serializable state of all caches (address, token and seen txids).
         The state can be used later with load_full_cache_state to restore the caches.
         """
         if not self.address_cache or not self.token_cache:
@@ -276,10 +333,11 @@ class ArkhamMonitor:
         try:
             return {
                 'address_cache': self.address_cache.get_state(),
-                'token_cache': self.token_cache.get_state()
+                'token_cache': self.token_cache.get_state(),
+                'seen_txids': self.seen_txids.get_state()
             }
         except Exception as e:
-            logger.exception(f"Ошибка при получении состояния кешей: {e}")
+            logger.exception("Ошибка при получении состояния кешей: %s", e)
             return {}
 
     def load_full_cache_state(self, full_state: dict | None):
@@ -288,7 +346,7 @@ class ArkhamMonitor:
         This will overwrite current cache contents.
 
         Args:
-            full_state: A dictionary containing 'address_cache' and 'token_cache' states,
+            full_state: A dictionary containing 'address_cache', 'token_cache' and (optionally) 'seen_txids' states,
                         as obtained from get_full_cache_state().
                         If None or empty, caches might be cleared or not modified based on cache implementation.
         """
@@ -306,7 +364,7 @@ class ArkhamMonitor:
                 self.address_cache.load_state(address_state)
                 logger.info("Состояние кеша адресов успешно загружено.")
             except Exception as e:
-                logger.exception(f"Ошибка при загрузке состояния кеша адресов: {e}")
+                logger.exception("Ошибка при загрузке состояния кеша адресов: %s", e)
         else:
             logger.info("Данные для кеша адресов не найдены в предоставленном состоянии.")
 
@@ -316,6 +374,14 @@ class ArkhamMonitor:
                 self.token_cache.load_state(token_state)
                 logger.info("Состояние кеша токенов успешно загружено.")
             except Exception as e:
-                logger.exception(f"Ошибка при загрузке состояния кеша токенов: {e}")
+                logger.exception("Ошибка при загрузке состояния кеша токенов: %s", e)
         else:
-            logger.info("Данные для кеша токенов не найдены в предоставленном состоянии.") 
\ No newline at end of file
+            logger.info("Данные для кеша токенов не найдены в предоставленном состоянии.") 
+
+        seen_state = full_state.get('seen_txids')
+        if seen_state is not None: # Older saved states have no seen txids - keep the current filter
+            try:
+                self.seen_txids.load_state(seen_state)
+                logger.info("Состояние фильтра обработанных транзакций успешно загружено.")
+            except Exception as e:
+                logger.exception("Ошибка при загрузке состояния фильтра обработанных транзакций: %s", e)
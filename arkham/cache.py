@@ -1,12 +1,56 @@
+import base64
+import hashlib
+import math
+import sys
 from collections import defaultdict
+from collections.abc import Mapping
+
+# Returned for lookups that miss, instead of allocating a fresh empty set per call.
+# Miss results are therefore immutable; callers that want to mutate a result should copy it with set(...)
+_EMPTY: frozenset[str] = frozenset()
+
+# Token synonyms (keys and values upper-case), same as original; module-level so lookups skip the class
+_TOKEN_SYNONYMS = {
+    'BTC': 'BITCOIN',
+    'BITCOIN': 'BITCOIN',
+    'ETH': 'WETH',
+    'WETH': 'WETH',
+    # Add more synonyms as needed
+}
+
+def _build_norm_to_synonyms(synonyms: dict[str, str]) -> dict[str, frozenset[str]]:
+    """Inverts {synonym: normalized} into {normalized: frozenset(synonyms)}."""
+    grouped = defaultdict(set)
+    for syn, norm in synonyms.items():
+        grouped[norm].add(syn)
+    return {norm: frozenset(syns) for norm, syns in grouped.items()}
 
 class AddressCache:
     """Manages caching of address identifiers and their display names."""
+    __slots__ = ('_cache', '_name_to_ids', '_real_name_refcount', '_sorted_names')
+
     def __init__(self):
         # {identifier: {'name': display_name, 'is_real': is_real_name}}
         self._cache = {}
         # {display_name: set(identifiers)}
-        self._name_to_ids = defaultdict(set)
+        self._name_to_ids: dict[str, set[str]] = {}
+        # {display_name: number of identifiers with is_real=True under that name} - keys are the real names
+        self._real_name_refcount: dict[str, int] = {}
+        # Memoized get_all_names() result; reset to None whenever a real name appears or disappears
+        self._sorted_names: list[str] | None = None
+
+    def _add_real_name(self, name: str):
+        count = self._real_name_refcount.get(name, 0)
+        if not count:
+            self._sorted_names = None
+        self._real_name_refcount[name] = count + 1
+
+    def _remove_real_name(self, name: str):
+        count = self._real_name_refcount.get(name, 0) - 1
+        if count > 0:
+            self._real_name_refcount[name] = count
+        elif self._real_name_refcount.pop(name, None) is not None:
+            self._sorted_names = None
 
     def update(self, identifier: str | None, display_name: str, is_real_name: bool):
         """Adds or updates an address entry in the cache."""
@@ -14,12 +58,21 @@ class AddressCache:
             return
             
         name_to_store = display_name if display_name and display_name != "N/A" else identifier
+        if type(name_to_store) is str:
+            # One shared object per name across _cache, _name_to_ids and the real-name index
+            name_to_store = sys.intern(name_to_store)
         
         # Check if entry exists and update logic (simplified for brevity for now)
         # Original code had logic to preferentially update if name became real, etc.
         # For now, just store/update.
         existing_entry = self._cache.get(identifier)
         
+        # Nothing to change: same name, is_real would stay the same, reverse mapping present
+        if (existing_entry and existing_entry['name'] == name_to_store
+                and (existing_entry['is_real'] or not is_real_name)
+                and identifier in self._name_to_ids.get(name_to_store, _EMPTY)):
+            return
+
         if existing_entry:
              # If name changes, remove old name mapping
             old_name = existing_entry['name']
@@ -29,52 +82,73 @@ class AddressCache:
                     del self._name_to_ids[old_name]
             
             # Update entry
+            was_real = existing_entry['is_real']
             existing_entry['name'] = name_to_store
             # Prefer keeping is_real=True if it was ever true
-            existing_entry['is_real'] = existing_entry['is_real'] or is_real_name
+            existing_entry['is_real'] = was_real or is_real_name
+            if was_real:
+                self._remove_real_name(old_name)
+            if existing_entry['is_real']:
+                self._add_real_name(name_to_store)
         else:
             self._cache[identifier] = {'name': name_to_store, 'is_real': is_real_name}
+            if is_real_name:
+                self._add_real_name(name_to_store)
         
         # Update name to id mapping
-        self._name_to_ids[name_to_store].add(identifier)
+        self._name_to_ids.setdefault(name_to_store, set()).add(identifier)
+
+    def update_many(self, entries):
+        """Applies update() to (identifier, display_name, is_real_name) entries in order.
+
+        Same resulting state as calling update() per entry; runs of identical entries (the same
+        wallet repeated in a page) are applied once.
+        """
+        update = self.update
+        previous = None
+        for entry in entries:
+            if entry != previous:
+                update(*entry)
+                previous = entry
 
     def get_name(self, identifier: str) -> str | None:
         """Gets the display name for a given identifier."""
         entry = self._cache.get(identifier)
         return entry['name'] if entry else None
 
-    def get_identifiers_by_name(self, display_name: str) -> set[str]:
-        """Gets the set of identifiers for a given display name."""
-        return self._name_to_ids.get(display_name, set())
+    def get_identifiers_by_name(self, display_name: str) -> set[str] | frozenset[str]:
+        """Gets the set of identifiers for a given display name (an empty frozenset if unknown)."""
+        return self._name_to_ids.get(display_name, _EMPTY)
 
     def get_all_names(self) -> list[str]:
         """Returns a sorted list of all unique display names marked as 'real' in the cache."""
-        real_names = set()
-        for identifier, entry in self._cache.items():
-            # Consider a name "real" if the flag is True
-            if entry.get('is_real', False):
-                 real_names.add(entry.get('name', identifier)) # Fallback to identifier if name somehow missing
-
-        # Additionally, include names from the reverse map that might correspond to real entries
-        # This handles cases where multiple identifiers might map to the same real name
-        for name, ids in self._name_to_ids.items():
-            for identifier in ids:
-                 entry = self._cache.get(identifier)
-                 if entry and entry.get('is_real', False):
-                     real_names.add(name)
-                     break # Found one real entry for this name, no need to check other IDs for the same name
-                     
-        return sorted(list(real_names))
-
-    def find_identifiers_by_names(self, names: list[str]) -> set[str]:
-        """Finds all identifiers corresponding to a list of display names."""
+        # Real names are tracked incrementally in update(); the sort is redone only after the name set changed
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self._real_name_refcount)
+        return list(self._sorted_names) # Copy, callers may mutate the returned list
+
+    def find_identifiers_by_names(self, names: list[str]) -> set[str] | frozenset[str]:
+        """Finds all identifiers corresponding to a list of display names (a shared empty frozenset if none)."""
         if not names:
-            return set() # Return empty set if no names provided
+            return _EMPTY # Return empty set if no names provided
             
-        all_ids = set()
-        for name in names:
-            all_ids.update(self.get_identifiers_by_name(name))
-        return all_ids
+        # Single multi-argument union (looped in C) instead of an update() per name
+        name_to_ids = self._name_to_ids
+        return set().union(*(name_to_ids.get(name, _EMPTY) for name in names))
+
+    def find_identifiers_by_names_set(self, names) -> frozenset[str]:
+        """Same as find_identifiers_by_names, but builds the frozen result directly (no set -> frozenset copy)."""
+        if not names:
+            return _EMPTY
+        name_to_ids = self._name_to_ids
+        return _EMPTY.union(*(name_to_ids.get(name, _EMPTY) for name in names))
+
+    def clear(self):
+        """Removes all entries from the cache."""
+        self._cache.clear()
+        self._name_to_ids.clear()
+        self._real_name_refcount.clear()
+        self._sorted_names = None
 
     def get_state(self) -> dict:
         """Returns a serializable state of the cache."""
@@ -91,7 +165,7 @@ class AddressCache:
         """
         self._cache = state.get('cache', {}).copy()
         
-        self._name_to_ids = defaultdict(set) # Re-initialize
+        self._name_to_ids = {} # Re-initialize
         name_to_ids_data = state.get('name_to_ids', {})
         for name, ids_iterable in name_to_ids_data.items():
             # Ensure ids_iterable is converted to a set before updating/assigning
@@ -100,90 +174,148 @@ class AddressCache:
                 current_set.update(ids_iterable)
             self._name_to_ids[name] = current_set
 
+        self._real_name_refcount = {}
+        self._sorted_names = None
+        for identifier, entry in self._cache.items():
+            if entry.get('is_real', False):
+                self._add_real_name(entry.get('name', identifier)) # Fallback to identifier if name somehow missing
+
+
+class _FrozenSetView(Mapping):
+    """Read-only live view of TokenCache's symbol -> IDs index.
+
+    Values are exposed as frozensets built on access and symbols without IDs are hidden, so reading
+    one symbol no longer copies the whole index. Each access pays for it instead: __getitem__ builds
+    a new frozenset and __len__ counts the non-empty symbols (O(n)).
+
+    Not thread-safe: __iter__ walks the live dict, so iterating (keys(), items(), len-then-iterate)
+    while another thread updates the cache, e.g. ArkhamMonitor's background monitoring, can raise
+    RuntimeError. Use deep_copy() for an independent snapshot in that case.
+    """
+    __slots__ = ('_token_cache',)
+
+    def __init__(self, token_cache: 'TokenCache'):
+        self._token_cache = token_cache # Not the dict itself: load_state() replaces it
+
+    def __getitem__(self, symbol: str) -> frozenset[str]:
+        ids = self._token_cache._symbol_to_ids[symbol]
+        if not ids:
+            raise KeyError(symbol)
+        return frozenset(ids)
+
+    def __iter__(self):
+        return (sym for sym, ids in self._token_cache._symbol_to_ids.items() if ids)
+
+    def __len__(self) -> int:
+        return sum(1 for ids in self._token_cache._symbol_to_ids.values() if ids)
+
+    def deep_copy(self) -> dict[str, set[str]]:
+        """Returns an independent {symbol: set(token_ids)} copy."""
+        # tuple() takes the items in one C-level step, so a concurrent update() cannot change the dict mid-walk
+        return {sym: ids.copy() for sym, ids in tuple(self._token_cache._symbol_to_ids.items()) if ids}
+
 
 class TokenCache:
     """Manages caching of token IDs and symbols, including synonyms."""
-    # Class-level synonyms, same as original
-    _token_synonyms = {
-        'BTC': 'BITCOIN',
-        'BITCOIN': 'BITCOIN',
-        'ETH': 'WETH',
-        'WETH': 'WETH',
-        # Add more synonyms as needed
-    }
+    __slots__ = ('_id_to_symbol', '_symbol_to_ids', '_sorted_symbols')
+    # Class-level alias of the module synonyms, kept for existing references
+    _token_synonyms = _TOKEN_SYNONYMS
+    # {normalized_symbol: frozenset(synonyms)} - precomputed so update() doesn't scan _TOKEN_SYNONYMS
+    _norm_to_synonyms = _build_norm_to_synonyms(_TOKEN_SYNONYMS)
 
     def __init__(self):
         # {token_id: symbol} 
         self._id_to_symbol = {}
         # {normalized_symbol: set(token_ids)}
-        self._symbol_to_ids = defaultdict(set)
+        self._symbol_to_ids: dict[str, set[str]] = {}
+        # Memoized get_all_symbols() result; reset to None by every update() that reaches the index
+        self._sorted_symbols: list[str] | None = None
         self._update_synonyms() # Populate initial synonyms
 
     def _update_synonyms(self):
         """Helper to ensure synonym map is populated correctly."""
         # Add direct synonyms
-        for syn, norm in self._token_synonyms.items():
+        for syn, norm in _TOKEN_SYNONYMS.items():
             if syn != norm: # Avoid self-mapping if listed explicitly
                  # Ensure the normalized form exists if it's a target
                 if norm not in self._symbol_to_ids: 
                     self._symbol_to_ids[norm] = set()
     
-    def _get_normalized_symbol(self, symbol: str) -> str:
-        """Returns the normalized symbol based on synonyms."""
-        return self.__class__._token_synonyms.get(symbol.upper(), symbol.upper())
-
     def update(self, token_id: str | None, symbol: str | None):
         """Adds or updates a token entry in the cache."""
         if not token_id or token_id == "N/A":
             return
 
-        symbol_to_store = symbol.upper() if symbol else "N/A"
-        normalized_symbol = self._get_normalized_symbol(symbol_to_store)
+        # Interned: the stored symbol is shared by _id_to_symbol and the _symbol_to_ids keys across all tokens
+        symbol_to_store = sys.intern(symbol.upper()) if symbol else "N/A"
+        normalized_symbol = _TOKEN_SYNONYMS.get(symbol_to_store, symbol_to_store) # upper-cased once above
+
+        # Already stored with the same symbol: the symbol -> IDs sets only ever grow, nothing to add
+        if (self._id_to_symbol.get(token_id) == symbol_to_store
+                and token_id in self._symbol_to_ids.get(normalized_symbol, _EMPTY)):
+            return
 
         # Store ID -> Symbol mapping
         self._id_to_symbol[token_id] = symbol_to_store
+        self._sorted_symbols = None # A symbol may get its first ID below
 
         # --- Update Symbol -> IDs mapping --- 
         # 1. Add to normalized symbol's set
-        self._symbol_to_ids[normalized_symbol].add(token_id)
+        self._symbol_to_ids.setdefault(normalized_symbol, set()).add(token_id)
         
         # 2. Add to original symbol's set if different from normalized
         if symbol_to_store != normalized_symbol:
-            self._symbol_to_ids[symbol_to_store].add(token_id)
+            self._symbol_to_ids.setdefault(symbol_to_store, set()).add(token_id)
             
         # 3. Add to other synonyms that map to the same normalized form
-        for syn, norm in self._token_synonyms.items():
-            if norm == normalized_symbol and syn != normalized_symbol and syn != symbol_to_store:
-                 self._symbol_to_ids[syn].add(token_id)
+        for syn in self._norm_to_synonyms.get(normalized_symbol, ()):
+            if syn != normalized_symbol and syn != symbol_to_store:
+                self._symbol_to_ids.setdefault(syn, set()).add(token_id)
         # --- End Update Symbol -> IDs --- 
 
+    def update_many(self, entries):
+        """Applies update() to (token_id, symbol) entries in order; runs of identical entries are applied once."""
+        update = self.update
+        previous = None
+        for entry in entries:
+            if entry != previous:
+                update(*entry)
+                previous = entry
+
     def get_symbol(self, token_id: str) -> str | None:
         """Gets the symbol for a given token ID."""
         return self._id_to_symbol.get(token_id)
 
-    def get_ids(self, symbol: str) -> set[str]:
-        """Gets the set of token IDs for a given symbol (case-insensitive, uses synonyms)."""
-        return self._symbol_to_ids.get(symbol.upper(), set())
+    def get_ids(self, symbol: str) -> set[str] | frozenset[str]:
+        """Gets the set of token IDs for a given symbol (case-insensitive, uses synonyms; an empty frozenset if unknown)."""
+        return self._symbol_to_ids.get(symbol.upper(), _EMPTY)
 
     def get_all_symbols(self) -> list[str]:
         """Returns a sorted list of all unique symbols known to the cache (excluding synonyms that don't exist)."""
-        # Return only symbols that actually have IDs associated
-        return sorted([sym for sym, ids in self._symbol_to_ids.items() if ids])
+        # Return only symbols that actually have IDs associated; rebuilt only after update()/load_state()
+        if self._sorted_symbols is None:
+            self._sorted_symbols = sorted([sym for sym, ids in self._symbol_to_ids.items() if ids])
+        return list(self._sorted_symbols) # Copy, callers may mutate the returned list
 
-    def find_ids_by_symbols(self, symbols: list[str]) -> set[str]:
-        """Finds all token IDs corresponding to a list of symbols (case-insensitive, uses synonyms)."""
+    def find_ids_by_symbols(self, symbols: list[str]) -> set[str] | frozenset[str]:
+        """Finds all token IDs corresponding to a list of symbols (case-insensitive, uses synonyms; a shared empty frozenset if none)."""
         if not symbols:
-            return set() # Return empty set if no symbols provided
+            return _EMPTY # Return empty set if no symbols provided
             
-        all_ids = set()
-        for symbol in symbols:
-            all_ids.update(self.get_ids(symbol))
-        return all_ids
+        symbol_to_ids = self._symbol_to_ids
+        return set().union(*(symbol_to_ids.get(symbol.upper(), _EMPTY) for symbol in symbols))
 
-    def get_symbol_to_ids_map(self) -> dict[str, set[str]]:
-        """Returns a copy of the mapping from symbols to sets of token IDs."""
-        # Return a copy to prevent external modification
-        return {sym: ids.copy() for sym, ids in self._symbol_to_ids.items() if ids}
+    def get_symbol_to_ids_map(self) -> Mapping[str, frozenset[str]]:
+        """Returns a read-only live view of the mapping from symbols to sets of token IDs (not thread-safe)."""
+        # Zero-copy view; callers that need an independent dict (or iterate during monitoring) use .deep_copy()
+        return _FrozenSetView(self)
+
+    def clear(self):
+        """Removes all tokens, keeping the base synonym structure."""
+        self._id_to_symbol.clear()
+        self._symbol_to_ids.clear()
+        self._sorted_symbols = None
+        self._update_synonyms()
 
     def get_state(self) -> dict:
         """Returns a serializable state of the cache."""
@@ -201,14 +333,92 @@ class TokenCache:
         self._id_to_symbol = state.get('id_to_symbol', {}).copy()
         
         # Re-initialize _symbol_to_ids and apply base synonym structure
-        self._symbol_to_ids = defaultdict(set)
+        self._symbol_to_ids = {}
+        self._sorted_symbols = None
         self._update_synonyms() # Establishes base synonym structure (e.g., empty sets for normalized forms)
         
         loaded_symbol_map = state.get('symbol_to_ids', {})
         for symbol_key, ids_iterable in loaded_symbol_map.items():
             # This will override the empty sets from _update_synonyms if symbol_key matches,
-            # or add new entries if the symbol_key was not part of initial _token_synonyms.
+            # or add new entries if the symbol_key was not part of initial _TOKEN_SYNONYMS.
             current_set = set()
             if isinstance(ids_iterable, (list, set, tuple)):
                 current_set.update(ids_iterable)
-            self._symbol_to_ids[symbol_key] = current_set 
\ No newline at end of file
+            self._symbol_to_ids[symbol_key] = current_set 
+
+
+class SeenTxidFilter:
+    """Bloom filter of transaction IDs already delivered by the monitor.
+
+    Uses a few bits per txid instead of a stored string, and its state is saved together with the
+    caches so deduplication survives restarts. Two generations are kept: once the current one holds
+    `capacity` txids it becomes the previous one and a fresh one starts, so memory stays fixed and
+    the false-positive rate (a new tx wrongly skipped) does not grow with uptime.
+    """
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Standard optimal sizing: m = -n*ln(p)/ln(2)^2 bits, k = m/n*ln(2) hashes
+        self._num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._num_hashes = max(1, round(self._num_bits / capacity * math.log(2)))
+        self._current = bytearray((self._num_bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0 # txids added to the current generation
+
+    def _positions(self, txid: str) -> list[int]:
+        # Stable digest (unlike hash()) so persisted bits stay valid across processes
+        digest = hashlib.blake2b(txid.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self._num_bits for i in range(self._num_hashes)]
+
+    @staticmethod
+    def _has_all(bits: bytearray, positions: list[int]) -> bool:
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in positions)
+
+    def __contains__(self, txid: str) -> bool:
+        positions = self._positions(txid)
+        return self._has_all(self._current, positions) or self._has_all(self._previous, positions)
+
+    def add(self, txid: str) -> bool:
+        """Marks a txid as seen. Returns False if it was (probably) seen already."""
+        positions = self._positions(txid)
+        if self._has_all(self._current, positions) or self._has_all(self._previous, positions):
+            return False
+        if self._count >= self.capacity:
+            self._previous = self._current
+            self._current = bytearray(len(self._previous))
+            self._count = 0
+        for pos in positions:
+            self._current[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+        return True
+
+    def get_state(self) -> dict:
+        """Returns a serializable state of the filter (bit arrays as base64 strings)."""
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'count': self._count,
+            'current': base64.b64encode(self._current).decode('ascii'),
+            'previous': base64.b64encode(self._previous).decode('ascii'),
+        }
+
+    def load_state(self, state: dict):
+        """Loads the filter state from a dictionary.
+
+        Args:
+            state: A dictionary previously obtained from get_state(). A state saved with different
+                   sizing parameters resets the filter, since its bit positions would not match.
+        """
+        current = base64.b64decode(state.get('current', ''))
+        previous = base64.b64decode(state.get('previous', ''))
+        if (state.get('capacity') != self.capacity or state.get('error_rate') != self.error_rate
+                or len(current) != len(self._current) or len(previous) != len(self._previous)):
+            self._current = bytearray(len(self._current))
+            self._previous = bytearray(len(self._previous))
+            self._count = 0
+            return
+        self._current = bytearray(current)
+        self._previous = bytearray(previous)
+        self._count = state.get('count', 0)
@@ -1,18 +1,175 @@
 import datetime
 from decimal import Decimal, ROUND_HALF_UP
 import decimal as decimal_module
+import functools
+import itertools
 import hashlib
+import math
+import re
+import sys
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
 from .cache import AddressCache, TokenCache
 from .config import get_logger
 
 logger = get_logger(__name__)
 
+# Arkham's fixed timestamp shape (e.g. 2024-01-31T12:34:56Z or with fractional seconds / offset);
+# for it the display string is just a slice, no datetime needed. Fields are range-checked so only
+# timestamps datetime accepts take the slice; years before 1000 (unpadded %Y), days 29-31 (month
+# lengths, leap years) and anything else go through datetime, which logs and passes invalid ones through
+_ISO_FAST = re.compile(
+    r'[1-9]\d{3}-(?:0[1-9]|1[0-2])-(?:0[1-9]|1\d|2[0-8])'
+    r'T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d(?:\.\d+)?(?:Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?'
+)
+
+# Quantizers reused by the formatters instead of parsing Decimal literals per call
+_Q6 = Decimal('0.000001')
+_Q0 = Decimal('1')
+# Responses at least this large get their USD column formatted in one NumPy pass
+_USD_BATCH_MIN_SIZE = 50
+# Below 2**52 a float's integer and fractional parts are exact, so half-up rounding can be done on floats
+_USD_FAST_PATH_LIMIT = 2 ** 52
+# USD given as a plain decimal string: half-up to whole dollars only needs the first fractional digit
+_PLAIN_USD = re.compile(r'(-?)(\d{1,22})(?:\.(\d+))?')
+
+# Longer strings are not interned: real addresses/ids are well below this, anything longer is unlikely to repeat
+_MAX_INTERN_LENGTH = 128
+
+def _intern(value):
+    """Interns string values: chains/symbols/token ids/addresses repeat across a response, so they share one object."""
+    return sys.intern(value) if type(value) is str and len(value) <= _MAX_INTERN_LENGTH else value
+
+# A plain decimal with at most 6 fractional digits is already at display precision: quantizing it is a no-op.
+# The integer part is capped so the quantized value would still fit Decimal's default 28-digit context
+_PLAIN_DECIMAL = re.compile(r'-?(?:0|[1-9]\d{0,21})(?:\.\d{1,6})?')
+_PLAIN_INT_LIMIT = 10 ** 22
+
+def _format_plain_value(value) -> str | None:
+    """Display string of a value already at <= 6 decimal places, taken from its text; None if Decimal is needed."""
+    cls = value.__class__
+    if cls is int:
+        return str(value) if -_PLAIN_INT_LIMIT < value < _PLAIN_INT_LIMIT else None
+    if cls is float:
+        text = repr(value)
+    elif cls is str:
+        text = value
+    else:
+        return None
+    if not _PLAIN_DECIMAL.fullmatch(text):
+        return None # exponent, more than 6 decimals, leading zeros, nan/inf...
+    return text.rstrip('0').rstrip('.') if '.' in text else text
+
+# Timestamps repeat per block and unitValues repeat within a page, so the slow (datetime/Decimal) paths are memoized.
+# Both raise on invalid input, and lru_cache doesn't cache exceptions: each bad value is still reported
+@functools.lru_cache(maxsize=4096)
+def _format_iso_timestamp(timestamp_str: str) -> str:
+    """Parses a non-standard ISO timestamp into YYYY-MM-DD HH:MM:SS; raises ValueError if it can't."""
+    # Handle potential 'Z' timezone format (only a trailing Z; no new string otherwise)
+    if timestamp_str.endswith('Z'):
+        timestamp_str = timestamp_str[:-1] + '+00:00'
+    return datetime.datetime.fromisoformat(timestamp_str).strftime('%Y-%m-%d %H:%M:%S')
+
+@functools.lru_cache(maxsize=4096)
+def _format_decimal_text(text: str) -> str:
+    """Display string of a value given as text (str(value)); raises decimal.InvalidOperation if it can't be formatted."""
+    return DataProcessor._format_decimal_value(Decimal(text))
+
+# Empty SHA-256 context for generated tx ids: copy() is a bit cheaper than sha256() construction.
+# It is never updated itself, so copying it from several threads is safe
+_SHA256_TEMPLATE = hashlib.sha256()
+
+@functools.lru_cache(maxsize=64)
+def _pow10(decimals: int) -> Decimal:
+    return Decimal(10) ** decimals
+
+# Mapping key -> ProcessedTx attribute; the keys are the field names of the former result dict
+_PROCESSED_TX_KEYS = {
+    "Время": "time",
+    "Сеть": "chain",
+    "Откуда": "from_display",
+    "Куда": "to_display",
+    "Символ": "symbol",
+    "Кол-во": "value",
+    "USD": "usd",
+    "_from_identifier": "from_identifier",
+    "_to_identifier": "to_identifier",
+    "_token_id": "token_id",
+    "USD_numeric": "usd_numeric",
+    "_txid": "txid",
+    "_raw_data": "raw_data",
+}
+
+@dataclass(slots=True, eq=False)
+class ProcessedTx(Mapping):
+    """A processed transfer with a fixed slot layout instead of a per-transaction dict.
+
+    Fields are read as attributes (tx.usd_numeric). For existing callers it is also a read-only
+    Mapping under the former dict keys (tx.get('USD'), tx['_txid']); to_dict() builds a plain dict.
+    """
+    time: str
+    chain: str
+    from_display: str
+    to_display: str
+    symbol: str | None
+    value: str
+    usd: str
+    from_identifier: str | None
+    to_identifier: str | None
+    token_id: str | None
+    usd_numeric: str | float | None
+    txid: str
+    raw_data: dict | None
+
+    def __getitem__(self, key: str):
+        attr = _PROCESSED_TX_KEYS.get(key)
+        if attr is None:
+            raise KeyError(key)
+        return getattr(self, attr)
+
+    def get(self, key: str, default=None):
+        attr = _PROCESSED_TX_KEYS.get(key)
+        return default if attr is None else getattr(self, attr)
+
+    def __contains__(self, key) -> bool:
+        return key in _PROCESSED_TX_KEYS
+
+    def __iter__(self):
+        return iter(_PROCESSED_TX_KEYS)
+
+    def __len__(self) -> int:
+        return len(_PROCESSED_TX_KEYS)
+
+    def to_dict(self) -> dict:
+        """Returns the transaction as a dict with the display/internal keys."""
+        return {key: getattr(self, attr) for key, attr in _PROCESSED_TX_KEYS.items()}
+
+@functools.lru_cache(maxsize=8192)
+def _build_display_name(address_str: str | None, entity_name: str | None, entity_type: str | None, label_name: str | None) -> str:
+    """Builds the display name for an address from its entity/label/address parts."""
+    entity_type_display = f" ({entity_type.capitalize()})" if entity_type else ""
+    if entity_name and label_name:
+        return f"{entity_name}{entity_type_display} - {label_name}"
+    if entity_name:
+        return f"{entity_name}{entity_type_display}"
+    if label_name:
+        return label_name
+    if address_str:
+        return f"{address_str[:5]}...{address_str[-5:]}" if len(address_str) > 10 else address_str
+    return "N/A"
+
 class DataProcessor:
-    """Processes raw transaction data from Arkham API into a structured format."""
+    """Processes raw transaction data from Arkham API into a structured format.
+
+    The raw API transfer is kept on results (ProcessedTx.raw_data / '_raw_data') only with keep_raw=True;
+    by default it is None, so processed pages don't keep the raw response alive.
+    """
 
-    def __init__(self, address_cache: AddressCache, token_cache: TokenCache):
+    def __init__(self, address_cache: AddressCache, token_cache: TokenCache, keep_raw: bool = False):
         self.address_cache = address_cache
         self.token_cache = token_cache
+        # Keep the raw API transfer in ProcessedTx.raw_data; off by default so a batch doesn't pin the raw response
+        self.keep_raw = keep_raw
 
     # --- Static Formatting Helpers (mostly unchanged from original) ---
     @staticmethod
@@ -20,12 +177,14 @@ class DataProcessor:
         """Formats ISO timestamp string to YYYY-MM-DD HH:MM:SS."""
         if not timestamp_str: 
             return "N/A"
+        if isinstance(timestamp_str, str) and _ISO_FAST.fullmatch(timestamp_str):
+            return f"{timestamp_str[0:10]} {timestamp_str[11:19]}"
         try:
-            # Handle potential 'Z' timezone format
-            dt_object = datetime.datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            return dt_object.strftime('%Y-%m-%d %H:%M:%S')
+            if isinstance(timestamp_str, str):
+                return _format_iso_timestamp(timestamp_str)
+            return datetime.datetime.fromisoformat(timestamp_str).strftime('%Y-%m-%d %H:%M:%S') # raises TypeError
         except (ValueError, TypeError):
-            logger.warning(f"Ошибка форматирования времени: {timestamp_str}") 
+            logger.warning("Ошибка форматирования времени: %s", timestamp_str)
             return str(timestamp_str)
 
     @staticmethod
@@ -33,61 +192,120 @@ class DataProcessor:
         """Formats a token value considering its decimals."""
         if value is None: 
             return "N/A"
+        if decimals is None and (plain := _format_plain_value(value)) is not None:
+            return plain
         try:
+            if decimals is None or decimals < 0:
+                return _format_decimal_text(str(value))
             value_dec = Decimal(str(value))
             # Note: The original /transfers API doesn't seem to provide decimals directly.
             # If decimals were available (e.g. from token details endpoint), they'd be used here.
-            if decimals is not None and decimals >= 0:
-                 value_dec = value_dec / (Decimal(10) ** decimals)
-            
-            # Use original formatting logic for consistency
-            is_zero_originally = value_dec.is_zero()
-            # Quantize to 6 decimal places for consistent comparison/display
-            quantized_value = value_dec.quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP)
-            formatted_str = "{:.6f}".format(quantized_value)
-            
-            # Avoid displaying 0.000000 for very small non-zero numbers
-            if formatted_str == '0.000000' and not is_zero_originally: 
-                 return '>0' # Or keep 0.000001? Let's use >0 for clarity
-                
-            # Strip trailing zeros and decimal point if possible
-            if '.' in formatted_str:
-                 stripped_str = formatted_str.rstrip('0').rstrip('.')
-                 return stripped_str if stripped_str else "0"
-            
-            return formatted_str # Should not happen if quantize worked
+            value_dec = value_dec / _pow10(decimals)
+            return DataProcessor._format_decimal_value(value_dec)
         except (ValueError, TypeError, decimal_module.InvalidOperation) as e:
-            logger.warning(f"Ошибка форматирования значения {value} с decimals {decimals}: {e}")
+            logger.warning("Ошибка форматирования значения %s с decimals %s: %s", value, decimals, e)
             return str(value)
 
+    @staticmethod
+    def _format_value_no_decimals(value: str | int | float | None) -> str:
+        """Same as _format_value(value, None) - the /transfers shape, where decimals are never known."""
+        if value is None: 
+            return "N/A"
+        # Most API values (ints, short floats) are already at display precision and need no Decimal
+        if (plain := _format_plain_value(value)) is not None:
+            return plain
+        try:
+            return _format_decimal_text(str(value))
+        except (ValueError, TypeError, decimal_module.InvalidOperation) as e:
+            logger.warning("Ошибка форматирования значения %s с decimals None: %s", value, e)
+            return str(value)
+
+    @staticmethod
+    def _format_decimal_value(value_dec: Decimal) -> str:
+        """Shared display logic of the value formatters: 6 places, '>0' for dust, no trailing zeros."""
+        # Use original formatting logic for consistency
+        is_zero_originally = value_dec.is_zero()
+        # Quantize to 6 decimal places for consistent comparison/display
+        quantized_value = value_dec.quantize(_Q6, rounding=ROUND_HALF_UP)
+        # str() of a Decimal with exponent -6 is the same fixed-point text as "{:.6f}", without the format-spec machinery
+        formatted_str = str(quantized_value)
+        
+        # Avoid displaying 0.000000 for very small non-zero numbers
+        if formatted_str == '0.000000' and not is_zero_originally: 
+             return '>0' # Or keep 0.000001? Let's use >0 for clarity
+            
+        # Strip trailing zeros and decimal point if possible
+        if '.' in formatted_str:
+             stripped_str = formatted_str.rstrip('0').rstrip('.')
+             return stripped_str if stripped_str else "0"
+        
+        return formatted_str # Should not happen if quantize worked
+
     @staticmethod
     def _format_usd(usd_value: str | float | None) -> str:
-        """Formats a USD value to $x,xxx.xx format."""
+        """Formats a USD value to $x,xxx format (whole dollars, rounded half-up)."""
         if usd_value is None: 
             return "N/A"
+        # Fast path for numeric JSON values: same ROUND_HALF_UP result without building a Decimal
+        if isinstance(usd_value, int) and not isinstance(usd_value, bool):
+            return "${:,}".format(usd_value)
+        if isinstance(usd_value, float) and math.isfinite(usd_value) and abs(usd_value) < _USD_FAST_PATH_LIMIT:
+            magnitude = abs(usd_value)
+            whole = math.floor(magnitude)
+            rounded = whole + 1 if magnitude - whole >= 0.5 else whole
+            return "$-{:,}".format(rounded) if math.copysign(1.0, usd_value) < 0 else "${:,}".format(rounded)
+        if isinstance(usd_value, str) and (plain := _PLAIN_USD.fullmatch(usd_value)):
+            sign, whole, fraction = plain.groups()
+            rounded = int(whole) + (1 if fraction and fraction[0] >= '5' else 0)
+            return ("$-{:,}" if sign else "${:,}").format(rounded)
         try:
             usd_dec = Decimal(str(usd_value))
             # Quantize to 0 decimal places (whole dollars)
-            formatted_usd = usd_dec.quantize(Decimal('1'), rounding=ROUND_HALF_UP) 
+            formatted_usd = usd_dec.quantize(_Q0, rounding=ROUND_HALF_UP) 
             return "${:,.0f}".format(formatted_usd) # Format with no decimal places
         except (ValueError, TypeError, decimal_module.InvalidOperation) as e:
-            logger.warning(f"Ошибка форматирования USD {usd_value}: {e}")
+            logger.warning("Ошибка форматирования USD %s: %s", usd_value, e)
             return str(usd_value)
 
+    @staticmethod
+    def _format_usd_batch(usd_values: list) -> list[str]:
+        """Formats a batch of USD values like _format_usd; floats are rounded half-up in one NumPy pass."""
+        import numpy as np
+
+        formatted: list[str | None] = [None] * len(usd_values)
+        float_positions = [i for i, v in enumerate(usd_values) if type(v) is float]
+        if float_positions:
+            values = np.fromiter((usd_values[i] for i in float_positions), dtype=np.float64, count=len(float_positions))
+            magnitude = np.abs(values)
+            whole = np.floor(magnitude)
+            with np.errstate(invalid='ignore'): # inf - inf; such values are excluded by `fast` below
+                rounded = whole + (magnitude - whole >= 0.5)
+            fast = np.isfinite(values) & (magnitude < _USD_FAST_PATH_LIMIT)
+            negative = np.signbit(values)
+            for i, r, is_fast, is_negative in zip(float_positions, rounded.tolist(), fast.tolist(), negative.tolist()):
+                if is_fast:
+                    formatted[i] = ("$-{:,}" if is_negative else "${:,}").format(int(r))
+        # ints, strings, None and extreme floats go through the scalar formatter
+        format_usd = DataProcessor._format_usd
+        return [f if f is not None else format_usd(v) for f, v in zip(formatted, usd_values)]
+
     # --- Static Address/Entity Extraction Helpers --- 
     @staticmethod
     def _extract_address_from_obj(addr_obj: dict | str | None) -> str | None:
         """Extracts the blockchain address string from various Arkham object formats."""
         if not addr_obj:
             return None
-        if isinstance(addr_obj, str):
+        # Exact type checks: parsed JSON only yields plain str/dict, and `is` skips isinstance's MRO walk
+        cls = addr_obj.__class__
+        if cls is str:
             return addr_obj # Already a string address
-        if isinstance(addr_obj, dict):
+        if cls is dict:
             # Can be nested: { "address": { "address": "0x..." }} or just { "address": "0x..." }
             inner_addr = addr_obj.get('address')
-            if isinstance(inner_addr, str):
+            inner_cls = inner_addr.__class__
+            if inner_cls is str:
                 return inner_addr
-            elif isinstance(inner_addr, dict):
+            if inner_cls is dict:
                 return inner_addr.get('address') # Extract from inner dict
         return None # Could not extract
 
@@ -103,72 +321,44 @@ class DataProcessor:
         
         address_str = None
         entity_name = None
+        entity_type = None
         label_name = None
-        entity_type_display = "" 
-        is_real_name = False
-        chain_str = None 
 
-        if isinstance(addr_data, dict):
-            address_str = self._extract_address_from_obj(addr_data) 
-            chain_str = addr_data.get('chain')
+        addr_cls = addr_data.__class__
+        if addr_cls is dict:
+            addr_get = addr_data.get # Bound once for the address/entity/label lookups
+            # Same as _extract_address_from_obj, inlined: addr_data is already known to be a non-empty dict
+            inner_addr = addr_get('address')
+            inner_cls = inner_addr.__class__
+            if inner_cls is str:
+                address_str = inner_addr
+            elif inner_cls is dict:
+                address_str = inner_addr.get('address')
             
-            entity_data = addr_data.get('arkhamEntity')
-            if isinstance(entity_data, dict):
+            entity_data = addr_get('arkhamEntity')
+            if entity_data.__class__ is dict:
                 entity_name = entity_data.get('name')
                 entity_type = entity_data.get('type')
-                if entity_type: entity_type_display = f" ({entity_type.capitalize()})"
-                if entity_name: is_real_name = True
                 
-            label_data = addr_data.get('arkhamLabel')
-            if isinstance(label_data, dict):
+            label_data = addr_get('arkhamLabel')
+            if label_data.__class__ is dict:
                 label_name = label_data.get('name')
-                if label_name: is_real_name = True 
 
-        elif isinstance(addr_data, str):
+        elif addr_cls is str:
             address_str = addr_data
-            is_real_name = False
         
         # --- Determine Identifier (ONLY the actual address string) ---
-        identifier = address_str # identifier - это ТОЛЬКО фактический адрес
+        identifier = _intern(address_str) # identifier - это ТОЛЬКО фактический адрес
 
         # Если identifier (т.е. address_str) отсутствует, мы не можем использовать 
         # entity_name или label_name в качестве идентификатора для фильтрации API.
         # display_name все равно будет сформирован ниже для отображения.
         # Вызов self.address_cache.update(None, display_name, ...) не добавит
         # некорректные "ID" в _name_to_ids.
-        
-        # Эта проверка, по сути, не нужна, если identifier = address_str, 
-        # т.к. AddressCache.update() сам обработает None identifier.
-        # Но оставим для ясности, что если нет address_str, то identifier = None.
-        if not identifier: 
-            pass 
-
-        # --- Generate Display Name (логика остается прежней) --- 
-        display_name = "N/A"
-        if entity_name and label_name:
-            display_name = f"{entity_name}{entity_type_display} - {label_name}"
-        elif entity_name:
-            display_name = f"{entity_name}{entity_type_display}"
-        elif label_name:
-            display_name = label_name
-        elif address_str:
-            if len(address_str) > 10:
-                 display_name = f"{address_str[:5]}...{address_str[-5:]}"
-            else:
-                 display_name = address_str
-        else: 
-             # Эта ветка теперь менее вероятна, если identifier был только address_str.
-             # Однако, если entity_name или label_name существуют при отсутствии address_str,
-             # они все еще могут сформировать display_name.
-             # Если и их нет, display_name останется "N/A" или будет сформирован из identifier, который теперь None.
-             # Нужно убедиться, что display_name корректно обрабатывает None identifier.
-             # Исходная логика здесь была: display_name = identifier. Если identifier=None, display_name будет None.
-             # Это нужно проверить. Лучше явный "N/A", если все остальное None.
-             if entity_name: # Повторяем логику, но уже зная, что address_str is None
-                 display_name = f"{entity_name}{entity_type_display}"
-             elif label_name:
-                 display_name = label_name
-             # Если display_name все еще "N/A" и identifier (address_str) был None, то так и остается.
+
+        # --- Generate Display Name (кешируется: одни и те же кошельки повторяются в ответах) --- 
+        display_name = _build_display_name(address_str, entity_name, entity_type, label_name)
+        is_real_name = bool(entity_name or label_name)
         
         # --- Update the cache with the extracted info ---
         self.address_cache.update(identifier, display_name, is_real_name)
@@ -187,112 +377,154 @@ class DataProcessor:
          chain = tx.get('chain')
          
          # Use chain as fallback ID/Symbol if specific token info is missing
-         if not token_id:
-             token_id = chain.upper() if chain else "UNKNOWN_CHAIN"
-         if not symbol:
-             symbol = chain.upper() if chain else "N/A"
+         if not token_id or not symbol:
+             chain_upper = chain.upper() if chain else None
+             if not token_id:
+                 token_id = chain_upper or "UNKNOWN_CHAIN"
+             if not symbol:
+                 symbol = chain_upper or "N/A"
              
+         token_id = _intern(token_id)
+         symbol = _intern(symbol)
+
          # Update cache
          self.token_cache.update(token_id, symbol)
          
          return token_id, symbol
 
-    def process_transaction(self, tx: dict) -> dict | None:
+    def process_transaction(self, tx: dict, formatted_usd: str | None = None,
+                            ts_cache: dict[str, str] | None = None) -> ProcessedTx | None:
         """Processes a single raw transaction dictionary.
         
+        Args:
+            tx: Raw transfer from the API.
+            formatted_usd: USD string already produced by _format_usd_batch (skips per-tx formatting).
+            ts_cache: Per-response {blockTimestamp: formatted time}; transfers of one block share a timestamp.
+        
         Returns:
-            A dictionary with formatted fields and internal identifiers, or None if invalid.
+            A ProcessedTx with formatted fields and internal identifiers, or None if invalid.
         """
-        if not tx or not isinstance(tx, dict):
+        try:
+            # Binding tx.get doubles as the type check: anything without .get is not a transfer object
+            tx_get = tx.get if tx else None # Bound once: ~10 field lookups per transaction below
+        except AttributeError:
+            tx_get = None
+        if tx_get is None:
             logger.warning("Получена невалидная транзакция для обработки.")
             return None
 
+        extract_address = self._extract_address_info # up to 4 calls per transaction
+
         # --- Extract and Update Cache for Addresses --- 
-        from_identifier, from_display, _ = self._extract_address_info(tx.get('fromAddress'))
+        from_identifier, from_display, _ = extract_address(tx_get('fromAddress'))
         # Handle Bitcoin's fromAddresses if fromAddress is missing
-        if not from_identifier and isinstance(tx.get('fromAddresses'), list) and tx['fromAddresses']:
+        if not from_identifier and isinstance(from_addresses := tx_get('fromAddresses'), list) and from_addresses:
              # Take the first one for simplicity, as in original code
-             addr_obj = tx['fromAddresses'][0].get('address')
-             from_identifier, from_display, _ = self._extract_address_info(addr_obj)
+             addr_obj = from_addresses[0].get('address')
+             from_identifier, from_display, _ = extract_address(addr_obj)
 
-        to_identifier, to_display, _ = self._extract_address_info(tx.get('toAddress'))
+        to_identifier, to_display, _ = extract_address(tx_get('toAddress'))
         # Handle Bitcoin's toAddresses
-        if not to_identifier and isinstance(tx.get('toAddresses'), list) and tx['toAddresses']:
-             addr_obj = tx['toAddresses'][0].get('address')
-             to_identifier, to_display, _ = self._extract_address_info(addr_obj)
+        if not to_identifier and isinstance(to_addresses := tx_get('toAddresses'), list) and to_addresses:
+             addr_obj = to_addresses[0].get('address')
+             to_identifier, to_display, _ = extract_address(addr_obj)
 
         # --- Extract and Update Cache for Token ---
         token_id, token_symbol = self._extract_token_info(tx)
 
         # --- Format other fields --- 
-        chain = tx.get('chain', 'N/A')
+        chain = _intern(tx_get('chain', 'N/A'))
         # Decimals are usually not in /transfers, pass None
-        raw_unit_value = tx.get('unitValue') # Получаем сырое значение
-        formatted_value = self._format_value(raw_unit_value, None) 
-        usd_numeric = tx.get('historicalUSD') # Keep numeric for filtering
-        formatted_usd = self._format_usd(usd_numeric)
-        block_timestamp = tx.get('blockTimestamp') # Получаем временную метку
-        formatted_time = self._format_timestamp(block_timestamp)
+        raw_unit_value = tx_get('unitValue') # Получаем сырое значение
+        formatted_value = self._format_value_no_decimals(raw_unit_value)
+        usd_numeric = tx_get('historicalUSD') # Keep numeric for filtering
+        if formatted_usd is None:
+            formatted_usd = self._format_usd(usd_numeric)
+        block_timestamp = tx_get('blockTimestamp') # Получаем временную метку
+        if ts_cache is not None and type(block_timestamp) is str:
+            formatted_time = ts_cache.get(block_timestamp)
+            if formatted_time is None:
+                formatted_time = ts_cache[block_timestamp] = self._format_timestamp(block_timestamp)
+        else:
+            formatted_time = self._format_timestamp(block_timestamp)
         
         # --- Assign or Generate Transaction ID ---
-        tx_id = tx.get('txid') or tx.get('transactionHash')
+        tx_id = tx_get('txid') or tx_get('transactionHash')
         if not tx_id:
             # Генерируем ID, если официальный отсутствует
             try:
                 # Собираем строку из ключевых полей (используем repr для стабильного представления None)
-                hash_input = "|".join([
-                    repr(block_timestamp),
-                    repr(from_identifier),
-                    repr(to_identifier),
-                    repr(token_id),
-                    repr(raw_unit_value), # Используем сырое значение
-                    repr(chain)
-                ])
-                # Вычисляем SHA-256 хеш
-                hash_object = hashlib.sha256(hash_input.encode('utf-8'))
+                # (одна f-строка вместо списка repr() + join; строка та же, поэтому и ID прежние)
+                hash_input = (
+                    f"{block_timestamp!r}|{from_identifier!r}|{to_identifier!r}|"
+                    f"{token_id!r}|{raw_unit_value!r}|{chain!r}" # Используем сырое значение
+                )
+                # Вычисляем SHA-256 хеш (стабильный формат ID: он хранится в состоянии мониторинга)
+                hash_object = _SHA256_TEMPLATE.copy()
+                hash_object.update(hash_input.encode('utf-8'))
                 tx_id = f"arkham_client_generated:{hash_object.hexdigest()}"
-                logger.debug(f"Сгенерирован ID транзакции: {tx_id} для данных: {hash_input}")
+                logger.debug("Сгенерирован ID транзакции: %s для данных: %s", tx_id, hash_input)
             except Exception as e:
-                logger.warning(f"Не удалось сгенерировать ID транзакции: {e}. Используется 'N/A'.")
+                logger.warning("Не удалось сгенерировать ID транзакции: %s. Используется 'N/A'.", e)
                 tx_id = "N/A" # Возвращаемся к N/A в случае ошибки генерации
         
-        # --- Assemble Processed Dictionary --- 
-        processed = {
+        # --- Assemble Processed Transaction --- 
+        return ProcessedTx(
             # Display fields (corresponds somewhat to original DataFrame columns)
-            "Время": formatted_time,
-            "Сеть": chain,
-            "Откуда": from_display,
-            "Куда": to_display,
-            "Символ": token_symbol,
-            "Кол-во": formatted_value,
-            "USD": formatted_usd,
+            time=formatted_time,
+            chain=chain,
+            from_display=from_display,
+            to_display=to_display,
+            symbol=token_symbol,
+            value=formatted_value,
+            usd=formatted_usd,
             
             # Internal fields for filtering and potential future use
-            "_from_identifier": from_identifier,
-            "_to_identifier": to_identifier,
-            "_token_id": token_id,
-            "USD_numeric": usd_numeric,
-            "_txid": tx_id, # Теперь содержит либо официальный ID, либо сгенерированный, либо N/A при ошибке генерации
-            "_raw_data": tx # Include raw data if needed later
-        }
-        return processed
-
-    def process_transactions_response(self, api_response: dict | None) -> list[dict]:
+            from_identifier=from_identifier,
+            to_identifier=to_identifier,
+            token_id=token_id,
+            usd_numeric=usd_numeric,
+            txid=tx_id, # Теперь содержит либо официальный ID, либо сгенерированный, либо N/A при ошибке генерации
+            raw_data=tx if self.keep_raw else None # Raw API data only when requested (keep_raw=True)
+        )
+
+    def process_transactions_iter(self, transfers) -> Iterator[ProcessedTx]:
+        """Processes transfers from any iterable (e.g. ArkhamClient.iter_transfers) as they arrive.
+
+        Invalid transfers are skipped, as in process_transactions_response; USD is formatted per transfer.
+        """
+        ts_cache: dict[str, str] = {} # Scoped to this stream, like the per-response cache
+        process = self.process_transaction
+        for tx in transfers:
+            processed_tx = process(tx, None, ts_cache)
+            if processed_tx is not None:
+                yield processed_tx
+
+    def process_transactions_response(self, api_response: dict | None) -> list[ProcessedTx]:
         """Processes the full list of transfers from an API response."""
         if not api_response or not isinstance(api_response.get('transfers'), list):
             logger.warning("Ответ API не содержит списка транзакций.")
             return []
 
-        processed_list = []
-        for tx in api_response['transfers']:
-            processed_tx = self.process_transaction(tx)
-            if processed_tx:
-                processed_list.append(processed_tx)
+        transfers = api_response['transfers']
+        if len(transfers) >= _USD_BATCH_MIN_SIZE:
+            usd_strings = self._format_usd_batch([
+                tx.get('historicalUSD') if isinstance(tx, dict) else None for tx in transfers
+            ])
+        else:
+            usd_strings = [None] * len(transfers) # process_transaction formats per transaction
+        ts_cache: dict[str, str] = {} # Scoped to this response: one timestamp formatting per block
+        # map() drives the loop in C and resolves self.process_transaction once
+        processed_list = [
+            processed_tx for processed_tx
+            in map(self.process_transaction, transfers, usd_strings, itertools.repeat(ts_cache))
+            if processed_tx is not None
+        ]
         
         count = len(processed_list)
         api_total_count = api_response.get('count', count)
         if count > 0:
-            logger.info(f"Обработано {count} транзакций (API count: {api_total_count}).")
+            logger.info("Обработано %d транзакций (API count: %s).", count, api_total_count)
         # else: logger doesn't log INFO by default anymore
             
         return processed_list 
\ No newline at end of file
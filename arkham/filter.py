@@ -20,10 +20,14 @@ class TransactionFilter:
         self.from_address_names: list[str] | None = None
         self.to_address_names: list[str] | None = None
         
-        # Store resolved IDs for efficiency during matching
-        self._allowed_token_ids: set[str] | None = None
-        self._allowed_from_ids: set[str] | None = None
-        self._allowed_to_ids: set[str] | None = None
+        # Store resolved IDs for efficiency during matching (frozen: snapshots of the cache lookups)
+        self._allowed_token_ids: frozenset[str] | None = None
+        self._allowed_from_ids: frozenset[str] | None = None
+        self._allowed_to_ids: frozenset[str] | None = None
+        # API parameter strings built from the resolved IDs (None when there are no IDs); they change only on update()
+        self._tokens_param: str | None = None
+        self._from_param: str | None = None
+        self._to_param: str | None = None
         
     def update(
         self,
@@ -42,13 +46,18 @@ class TransactionFilter:
         
         # Resolve IDs based on the new criteria
         self._resolve_filter_ids()
-        logger.info(f"Фильтры обновлены: USD>={min_usd}, Lookback={lookback}, Tokens={token_symbols}, From={from_address_names}, To={to_address_names}")
+        logger.info("Фильтры обновлены: USD>=%s, Lookback=%s, Tokens=%s, From=%s, To=%s",
+                    min_usd, lookback, token_symbols, from_address_names, to_address_names)
 
     def _resolve_filter_ids(self):
         """Resolves names/symbols to sets of IDs using the caches."""
-        self._allowed_token_ids = self.token_cache.find_ids_by_symbols(self.token_symbols) if self.token_symbols else None
-        self._allowed_from_ids = self.address_cache.find_identifiers_by_names(self.from_address_names) if self.from_address_names else None
-        self._allowed_to_ids = self.address_cache.find_identifiers_by_names(self.to_address_names) if self.to_address_names else None
+        self._allowed_token_ids = frozenset(self.token_cache.find_ids_by_symbols(self.token_symbols)) if self.token_symbols else None
+        self._allowed_from_ids = self.address_cache.find_identifiers_by_names_set(self.from_address_names) if self.from_address_names else None
+        self._allowed_to_ids = self.address_cache.find_identifiers_by_names_set(self.to_address_names) if self.to_address_names else None
+        # API expects lowercase, comma-separated token IDs; addresses are passed as is
+        self._tokens_param = ",".join(sorted(self._allowed_token_ids)).lower() if self._allowed_token_ids else None
+        self._from_param = ",".join(sorted(self._allowed_from_ids)) if self._allowed_from_ids else None
+        self._to_param = ",".join(sorted(self._allowed_to_ids)) if self._allowed_to_ids else None
 
     def get_api_params(self, limit: int = DEFAULT_LIMIT) -> dict:
         """Constructs parameters suitable for the initial API request."""
@@ -64,9 +73,9 @@ class TransactionFilter:
         # we can ask the API to pre-filter. If IDs are not known yet, we filter post-fetch.
         if self._allowed_token_ids is not None: # Check if token filter is active and resolved
             if self._allowed_token_ids: # Check if any IDs were actually found
-                 # API expects lowercase, comma-separated string
-                params['tokens'] = ",".join(sorted(list(self._allowed_token_ids))).lower()
-                logger.debug(f"Добавляем параметр API 'tokens': {params['tokens']}")
+                 # API expects lowercase, comma-separated string (built once in _resolve_filter_ids)
+                params['tokens'] = self._tokens_param
+                logger.debug("Добавляем параметр API 'tokens': %s", params['tokens'])
             else:
                 # If symbols were specified but no IDs found, prevent API call from returning anything
                 # by setting a non-existent token ID (or handle differently). Or just let post-filtering handle it.
@@ -80,8 +89,7 @@ class TransactionFilter:
         if self._allowed_from_ids is not None:
             if self._allowed_from_ids:
                 # Используем 'from' вместо 'fromAddresses'
-                from_str = ",".join(sorted(list(self._allowed_from_ids)))
-                params['from'] = from_str
+                params['from'] = self._from_param
             else:
                 # Этот случай означает: from_address_names были указаны, но не разрешились ни в какие ID.
                 logger.debug("Фильтр по 'Откуда' активен, но ID для указанных имен не найдены в кеше.")
@@ -89,8 +97,7 @@ class TransactionFilter:
         if self._allowed_to_ids is not None:
             if self._allowed_to_ids:
                 # Используем 'to' вместо 'toAddresses'
-                to_str = ",".join(sorted(list(self._allowed_to_ids)))
-                params['to'] = to_str
+                params['to'] = self._to_param
             else:
                 # Этот случай означает: to_address_names были указаны, но не разрешились ни в какие ID.
                 logger.debug("Фильтр по 'Куда' активен, но ID для указанных имен не найдены в кеше.")
@@ -106,46 +113,5 @@ class TransactionFilter:
         # Since filtering is now primarily done via API parameters constructed 
         # in get_api_params based on user selections from cached data, 
         # this local matching logic is disabled by default.
+        # (The former local USD/token/address checks were unreachable after this return and were removed.)
         return True # Assume anything received from API (after its filtering) is a match
-        
-        # --- Старая логика локальной проверки (закомментирована) ---
-        # if not processed_tx:
-        #     return False
-        # ... (остальная логика проверки USD, токенов, адресов) ...
-        # return True
-
-        # 1. Check USD value
-        if self.min_usd is not None:
-            usd_numeric = processed_tx.get('USD_numeric')
-            if usd_numeric is None or float(usd_numeric) < self.min_usd:
-                return False
-
-        # 2. Check Token Symbol (using resolved IDs)
-        # If _allowed_token_ids is None, the filter is inactive -> match
-        # If _allowed_token_ids is empty set, filter is active but no match possible -> no match
-        # If _allowed_token_ids has IDs, check if tx token ID is present -> match if present
-        if self._allowed_token_ids is not None:
-            if not self._allowed_token_ids: # Empty set means filter is active but nothing matches
-                return False 
-            tx_token_id = processed_tx.get('_token_id')
-            if tx_token_id is None or tx_token_id not in self._allowed_token_ids:
-                return False
-
-        # 3. Check From Address Name (using resolved IDs)
-        if self._allowed_from_ids is not None:
-            if not self._allowed_from_ids:
-                 return False
-            tx_from_id = processed_tx.get('_from_identifier')
-            if tx_from_id is None or tx_from_id not in self._allowed_from_ids:
-                return False
-                
-        # 4. Check To Address Name (using resolved IDs)
-        if self._allowed_to_ids is not None:
-            if not self._allowed_to_ids:
-                 return False
-            tx_to_id = processed_tx.get('_to_identifier')
-            if tx_to_id is None or tx_to_id not in self._allowed_to_ids:
-                return False
-
-        # If all checks passed
-        return True 
\ No newline at end of file
@@ -52,9 +52,15 @@ setup(
         'python-dotenv>=0.15',
         'requests>=2.20',    # Добавьте 'requests' или другую HTTP библиотеку, если она используется
                              # в вашей папке arkham/ для API запросов.
+        'orjson>=3.0',       # Быстрый разбор JSON ответов API (без него используется stdlib json)
         # 'aiohttp>=3.0',    # Если используете асинхронные запросы
         # ...другие критичные зависимости для работы arkham/...
     ],
+    extras_require={ # Опциональные зависимости
+        'async': ['httpx[http2]>=0.23'], # AsyncArkhamClient (arkham/arkham_client_async.py)
+        'stream': ['ijson>=3.1'], # ArkhamClient.iter_transfers: потоковый разбор ответа (use_float)
+        'compression': ['brotli>=1.0', 'zstandard>=0.18'], # br/zstd ответы API (декодирует urllib3; zstd с urllib3>=2)
+    },
     # entry_points={ # Если у вас есть консольные скрипты в библиотеке (опционально)
     #     'console_scripts': [
     #         'arkham-cli=arkham.cli:main',
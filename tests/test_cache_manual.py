@@ -19,19 +19,19 @@ def test_address_cache():
     cache.update("binance-cex-id", "Binance", True)
     cache.update("kraken-deposit-addr", "Kraken Deposit", True)
     print(f"  Cache state: {cache._cache}")
-    print(f"  Name->IDs map: {dict(cache._name_to_ids)}") # Преобразуем defaultdict для печати
+    print(f"  Name->IDs map: {cache._name_to_ids}") # Обычный dict: печатается без копирования
 
     # 2. Добавляем запись без метки (адрес), is_real=False
     print("\n2. Добавляем адрес '0x123...abc' (real=False)")
     cache.update("0x123abc", "0x123...abc", False) 
     print(f"  Cache state: {cache._cache}")
-    print(f"  Name->IDs map: {dict(cache._name_to_ids)}")
+    print(f"  Name->IDs map: {cache._name_to_ids}")
 
     # 3. Добавляем еще один идентификатор для существующего имени
     print("\n3. Добавляем 'binance-cex-id-2' для имени 'Binance' (real=True)")
     cache.update("binance-cex-id-2", "Binance", True)
     print(f"  Cache state: {cache._cache}")
-    print(f"  Name->IDs map: {dict(cache._name_to_ids)}")
+    print(f"  Name->IDs map: {cache._name_to_ids}")
 
     # 4. Получаем список "реальных" имен
     print("\n4. Получаем get_all_names() (должны быть только реальные):")
@@ -68,7 +68,7 @@ def test_token_cache():
     cache.update("unknown-token-id", None) # Токен без символа
     
     print(f"  ID->Symbol map: {cache._id_to_symbol}")
-    print(f"  Symbol->IDs map: {dict(cache._symbol_to_ids)}")
+    print(f"  Symbol->IDs map: {cache._symbol_to_ids}")
 
     # 2. Получаем все символы
     print("\n2. Получаем get_all_symbols():")
@@ -12,6 +12,10 @@ sys.path.insert(0, project_root)
 from arkham.cache import AddressCache, TokenCache
 from arkham.arkham_monitor import ArkhamMonitor
 
+def _as_frozensets(name_to_ids: dict) -> dict:
+    """Normalizes {key: list_of_ids} from get_state() to {key: frozenset} for order-insensitive comparison."""
+    return {k: frozenset(v) for k, v in name_to_ids.items()}
+
 def deep_compare_states(state1: dict, state2: dict, cache_type: str) -> bool:
     """Deep compares two cache states, handling sets stored as lists."""
     if cache_type == "address":
@@ -26,10 +30,11 @@ def deep_compare_states(state1: dict, state2: dict, cache_type: str) -> bool:
         if s1_name_to_ids.keys() != s2_name_to_ids.keys():
             print(f"  [FAIL] AddressCache 'name_to_ids' keys mismatch:\n  State1 keys: {s1_name_to_ids.keys()}\n  State2 keys: {s2_name_to_ids.keys()}")
             return False
-        for key in s1_name_to_ids:
-            if set(s1_name_to_ids[key]) != set(s2_name_to_ids[key]): # Compare as sets
+        n1, n2 = _as_frozensets(s1_name_to_ids), _as_frozensets(s2_name_to_ids)
+        if n1 != n2: # Compare as sets, one dict comparison; per-key diagnostics only on mismatch
+            for key in sorted(k for k in n1 if n1[k] != n2[k]):
                 print(f"  [FAIL] AddressCache 'name_to_ids' value mismatch for key '{key}':\n  State1: {s1_name_to_ids[key]}\n  State2: {s2_name_to_ids[key]}")
-                return False
+            return False
         print("  [OK] AddressCache states appear identical.")
         return True
 
@@ -45,10 +50,11 @@ def deep_compare_states(state1: dict, state2: dict, cache_type: str) -> bool:
         if s1_symbol_to_ids.keys() != s2_symbol_to_ids.keys():
             print(f"  [FAIL] TokenCache 'symbol_to_ids' keys mismatch:\n  State1 keys: {s1_symbol_to_ids.keys()}\n  State2 keys: {s2_symbol_to_ids.keys()}")
             return False
-        for key in s1_symbol_to_ids:
-            if set(s1_symbol_to_ids[key]) != set(s2_symbol_to_ids[key]): # Compare as sets
+        n1, n2 = _as_frozensets(s1_symbol_to_ids), _as_frozensets(s2_symbol_to_ids)
+        if n1 != n2: # Compare as sets, one dict comparison; per-key diagnostics only on mismatch
+            for key in sorted(k for k in n1 if n1[k] != n2[k]):
                 print(f"  [FAIL] TokenCache 'symbol_to_ids' value mismatch for key '{key}':\n  State1: {s1_symbol_to_ids[key]}\n  State2: {s2_symbol_to_ids[key]}")
-                return False
+            return False
         print("  [OK] TokenCache states appear identical.")
         return True
     return False
@@ -67,7 +73,7 @@ def test_address_cache_serialization():
     
     print("1. Исходный AddressCache наполнен:")
     print(f"  _cache: {original_cache._cache}")
-    print(f"  _name_to_ids: {dict(original_cache._name_to_ids)}")
+    print(f"  _name_to_ids: {original_cache._name_to_ids}")
     print(f"  All real names: {original_cache.get_all_names()}")
 
     # 2. Получаем состояние кеша
@@ -82,13 +88,13 @@ def test_address_cache_serialization():
     loaded_cache.load_state(cache_state)
     print("\n3. Состояние загружено в новый AddressCache:")
     print(f"  Loaded _cache: {loaded_cache._cache}")
-    print(f"  Loaded _name_to_ids: {dict(loaded_cache._name_to_ids)}")
+    print(f"  Loaded _name_to_ids: {loaded_cache._name_to_ids}")
 
     # 4. Сравниваем состояния и результаты методов
     print("\n4. Сравнение исходного и загруженного AddressCache:")
     
     # Сравнение внутренних структур (ключевой момент)
-    # Прямое сравнение dict(original_cache._name_to_ids) и dict(loaded_cache._name_to_ids) может быть неточным из-за порядка в set
+    # Прямое сравнение original_cache._name_to_ids и loaded_cache._name_to_ids может быть неточным из-за порядка в set
     # Поэтому get_state() из обоих должен быть идентичен, т.к. он сортирует/нормализует вывод list(set)
     loaded_cache_state_after_load = loaded_cache.get_state()
     assert deep_compare_states(cache_state, loaded_cache_state_after_load, "address"), "Состояния AddressCache (до и после загрузки) не совпадают!"
@@ -122,7 +128,7 @@ def test_token_cache_serialization():
 
     print("1. Исходный TokenCache наполнен:")
     print(f"  _id_to_symbol: {original_cache._id_to_symbol}")
-    print(f"  _symbol_to_ids: {dict(original_cache._symbol_to_ids)}")
+    print(f"  _symbol_to_ids: {original_cache._symbol_to_ids}")
     print(f"  All symbols: {original_cache.get_all_symbols()}")
 
     # 2. Получаем состояние кеша
@@ -137,7 +143,7 @@ def test_token_cache_serialization():
     loaded_cache.load_state(cache_state)
     print("\n3. Состояние загружено в новый TokenCache:")
     print(f"  Loaded _id_to_symbol: {loaded_cache._id_to_symbol}")
-    print(f"  Loaded _symbol_to_ids: {dict(loaded_cache._symbol_to_ids)}")
+    print(f"  Loaded _symbol_to_ids: {loaded_cache._symbol_to_ids}")
 
     # 4. Сравниваем состояния и результаты методов
     print("\n4. Сравнение исходного и загруженного TokenCache:")
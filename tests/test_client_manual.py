@@ -4,6 +4,7 @@
 import sys
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Добавляем корень проекта в sys.path
@@ -26,15 +27,34 @@ def test_api_calls():
         return
 
     print("\n--- Тестирование ArkhamClient ---")
+    executor = None
     try:
         client = ArkhamClient(api_key=api_key)
         print("ArkhamClient успешно инициализирован.")
 
+        # Три запроса независимы: отправляем их сразу параллельно, а результаты разбираем по порядку ниже.
+        # future.result() возвращает ответ или пробрасывает то же исключение, что и прямой вызов get_transfers()
+        def fetch(params):
+            # requests.Session не гарантирует потокобезопасность - у каждого потока свой клиент со своей сессией
+            worker_client = ArkhamClient(api_key=api_key)
+            try:
+                return worker_client.get_transfers(params=params)
+            finally:
+                worker_client.close()
+
+        params_step1 = {'limit': 5, 'timeLast': '5m'}
+        params_step2 = {'limit': 10, 'timeLast': '1h', 'usdGte': 100000}
+        params_step3 = {'limit': 1, 'timeLast': 'invalid-format'}
+        executor = ThreadPoolExecutor(max_workers=3)
+        future_step1, future_step2, future_step3 = (
+            executor.submit(fetch, params)
+            for params in (params_step1, params_step2, params_step3)
+        )
+
         # --- Тест 1: Базовый запрос get_transfers ---
         print("\n1. Выполняем базовый запрос get_transfers (limit=5, lookback='5m')")
-        params_step1 = {'limit': 5, 'timeLast': '5m'}
         try:
-            response_step1 = client.get_transfers(params=params_step1)
+            response_step1 = future_step1.result()
             print("  Запрос выполнен успешно.")
             
             # Проверяем базовую структуру ответа
@@ -62,10 +82,9 @@ def test_api_calls():
 
         # --- Тест 2: Запрос с фильтрами --- 
         print("\n2. Выполняем запрос get_transfers с фильтрами (limit=10, lookback='1h', usdGte=100000)")
-        params_step2 = {'limit': 10, 'timeLast': '1h', 'usdGte': 100000}
-        # Можно добавить 'tokens': 'usdc,eth' или 'from': 'some_real_address' если нужно проверить их
+        # Можно добавить 'tokens': 'usdc,eth' или 'from': 'some_real_address' в params_step2, если нужно проверить их
         try:
-            response_step2 = client.get_transfers(params=params_step2)
+            response_step2 = future_step2.result()
             print("  Запрос с фильтрами выполнен успешно.")
             if isinstance(response_step2, dict) and 'transfers' in response_step2 and isinstance(response_step2['transfers'], list):
                 transfers_list_2 = response_step2['transfers']
@@ -87,9 +106,8 @@ def test_api_calls():
             
         # --- Тест 3: Запрос с потенциально невалидными параметрами --- 
         print("\n3. Выполняем запрос с невалидным параметром (timeLast='invalid-format')")
-        params_step3 = {'limit': 1, 'timeLast': 'invalid-format'}
         try:
-            response_step3 = client.get_transfers(params=params_step3)
+            response_step3 = future_step3.result()
             # Если мы сюда попали, API не вернул ошибку - это странно, но возможно
             print(f"  ПРЕДУПРЕЖДЕНИЕ: Запрос с невалидным timeLast НЕ вызвал ошибку API. Ответ: {response_step3}") 
         except ArkhamAPIError as e:
@@ -109,6 +127,9 @@ def test_api_calls():
     except Exception as e:
         print(f"НЕПРЕДВИДЕННАЯ ОШИБКА на уровне инициализации: {e}")
         logger.exception("Непредвиденная ошибка при инициализации клиента")
+    finally:
+        if executor is not None:
+            executor.shutdown()
         
     print("\n--- Тестирование ArkhamClient Завершено ---")
 
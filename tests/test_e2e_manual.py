@@ -57,7 +57,7 @@ def run_e2e_test():
         logger.info(f"Найдено символов токенов: {len(known_tokens)}")
         if known_tokens:
             print(f"  Символы: {known_tokens}")
-        # print(f"  Карта токенов: {json.dumps(token_map, indent=2, default=list)}") # Можно раскомментировать для отладки
+        # print(f"  Карта токенов: {json.dumps(token_map.deep_copy(), indent=2, default=list)}") # Можно раскомментировать для отладки
         
     except (ValueError, ArkhamAPIError) as e:
         logger.error(f"Ошибка на Шаге 1: {e}")
@@ -121,7 +121,8 @@ def run_e2e_test():
             pd.set_option('display.max_rows', 10)
             pd.set_option('display.max_columns', None)
             pd.set_option('display.width', 1000)
-            print(df.head().to_string(index=False))
+            head = df.head()
+            print(head.to_string(index=False))
             
             # Визуальная проверка соответствия фильтрам (т.к. локальная фильтрация отключена)
             print("\nПроверка соответствия результата фильтрам (визуальная):")
@@ -129,27 +130,34 @@ def run_e2e_test():
             print(f"  Ожидался Отправитель (имя): {target_address_name_list}")
             print(f"  Ожидался USD >= {target_usd}")
             # Проверим первые несколько строк
-            for index, row in df.head().iterrows():
-                match = True
-                if target_token_symbol_list and row['Символ'] not in target_token_symbol_list:
-                     # Учитываем синонимы ETH/WETH и BTC/BITCOIN
-                    if not ((row['Символ'] in ['ETH','WETH'] and any(ts in ['ETH','WETH'] for ts in target_token_symbol_list)) or \
-                            (row['Символ'] in ['BTC','BITCOIN'] and any(ts in ['BTC','BITCOIN'] for ts in target_token_symbol_list))):
-                        print(f"    Строка {index}: НЕСООТВЕТСТВИЕ ТОКЕНА! Ожидался '{target_token_symbol_list}', получен '{row['Символ']}'")
-                        match = False
-                if target_address_name_list and row['Откуда'] not in target_address_name_list:
-                    print(f"    Строка {index}: НЕСООТВЕТСТВИЕ ОТПРАВИТЕЛЯ! Ожидался '{target_address_name_list}', получен '{row['Откуда']}'")
-                    match = False
-                # Проверка USD - API должен был отфильтровать, но проверим для уверенности
-                try:
-                    usd_num_str = row['USD'].replace('$','').replace(',','')
-                    if float(usd_num_str) < target_usd:
-                        print(f"    Строка {index}: НЕСООТВЕТСТВИЕ USD! Ожидался >= {target_usd}, получен {row['USD']}")
-                        match = False
-                except ValueError:
-                    pass # Не можем сравнить, если USD не число
-                if match:
-                     print(f"    Строка {index}: Соответствует (визуально).")
+            # Маски считаются один раз по столбцам, построчно только печать
+            token_ok = pd.Series(True, index=head.index)
+            if target_token_symbol_list:
+                # Учитываем синонимы ETH/WETH и BTC/BITCOIN
+                allowed_tokens = set(target_token_symbol_list)
+                for group in ({'ETH', 'WETH'}, {'BTC', 'BITCOIN'}):
+                    if group & allowed_tokens:
+                        allowed_tokens |= group
+                token_ok = head['Символ'].isin(frozenset(allowed_tokens))
+            sender_ok = pd.Series(True, index=head.index)
+            if target_address_name_list:
+                sender_ok = head['Откуда'].isin(frozenset(target_address_name_list))
+            # Проверка USD - API должен был отфильтровать, но проверим для уверенности
+            usd_num = pd.to_numeric(head['USD'].astype(str).str.replace(r'[$,]', '', regex=True), errors='coerce')
+            usd_ok = ~(usd_num < target_usd) # Не можем сравнить, если USD не число (NaN) - считаем соответствующим
+            # Вердикты собираются в список и выводятся одним print()
+            report = []
+            for index in head.index:
+                row = head.loc[index]
+                if not token_ok[index]:
+                    report.append(f"    Строка {index}: НЕСООТВЕТСТВИЕ ТОКЕНА! Ожидался '{target_token_symbol_list}', получен '{row['Символ']}'")
+                if not sender_ok[index]:
+                    report.append(f"    Строка {index}: НЕСООТВЕТСТВИЕ ОТПРАВИТЕЛЯ! Ожидался '{target_address_name_list}', получен '{row['Откуда']}'")
+                if not usd_ok[index]:
+                    report.append(f"    Строка {index}: НЕСООТВЕТСТВИЕ USD! Ожидался >= {target_usd}, получен {row['USD']}")
+                if token_ok[index] and sender_ok[index] and usd_ok[index]:
+                    report.append(f"    Строка {index}: Соответствует (визуально).")
+            print("\n".join(report))
                      
         else:
             logger.info("DataFrame пуст. Транзакций по заданным фильтрам не найдено.")
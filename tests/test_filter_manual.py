@@ -40,7 +40,7 @@ def populate_caches():
     print("--- Начальное состояние кешей ---")
     print(f"  Address Names (real): {address_cache.get_all_names()}")
     print(f"  Token Symbols: {token_cache.get_all_symbols()}")
-    print(f"  Token Map: {json.dumps(token_cache.get_symbol_to_ids_map(), indent=4, default=list)}")
+    print(f"  Token Map: {json.dumps(token_cache.get_symbol_to_ids_map().deep_copy(), indent=4, default=list)}")
     print("---------------------------------")
     return address_cache, token_cache
 
@@ -4,6 +4,7 @@
 import sys
 import os
 import json
+import types
 import pandas as pd
 
 # Добавляем корень проекта в sys.path
@@ -52,11 +53,14 @@ MOCK_RAW_TRANSACTIONS = [
     # Пропускаем транзакции 5 и 6 для краткости этого теста
 ]
 
-MOCK_API_RESPONSE = {'transfers': MOCK_RAW_TRANSACTIONS, 'count': len(MOCK_RAW_TRANSACTIONS)}
+# Read-only прокси: один объект на все вызовы, случайная модификация ответа вызовет TypeError
+MOCK_API_RESPONSE = types.MappingProxyType({'transfers': MOCK_RAW_TRANSACTIONS, 'count': len(MOCK_RAW_TRANSACTIONS)})
 
 # --- Mock Класс для ArkhamClient ---
 class MockArkhamClient:
     """Имитирует ArkhamClient, возвращая MOCK_API_RESPONSE."""
+    __slots__ = ('last_called_params',)
+
     def __init__(self, api_key: str, base_url: str):
         print(f"[MockArkhamClient] Инициализирован с api_key=***, base_url={base_url}")
         self.last_called_params = None # Сохраняем параметры последнего вызова
@@ -67,7 +71,7 @@ class MockArkhamClient:
         # Имитируем ответ API
         # В реальном моке можно было бы даже фильтровать MOCK_RAW_TRANSACTIONS 
         # на основе params, но сейчас просто вернем все для проверки обработки.
-        return MOCK_API_RESPONSE.copy() # Возвращаем копию, чтобы избежать модификации
+        return MOCK_API_RESPONSE # Read-only, копия не нужна
 
 def test_arkham_monitor():
     print("\n--- Тестирование ArkhamMonitor с Mock Client ---")
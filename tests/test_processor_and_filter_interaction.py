@@ -13,6 +13,9 @@ from arkham.cache import AddressCache, TokenCache
 from arkham.data_processor import DataProcessor
 from arkham.filter import TransactionFilter
 
+# ARKHAM_TEST_VERBOSE=0 отключает печать полных обработанных транзакций; проверки печатаются всегда
+VERBOSE = os.getenv('ARKHAM_TEST_VERBOSE', '1') != '0'
+
 def test_identifier_resolution_and_filtering():
     print("\n--- Тестирование разрешения идентификаторов и взаимодействия с фильтром ---")
 
@@ -47,7 +50,8 @@ def test_identifier_resolution_and_filtering():
     }
 
     processed_tx1 = data_processor.process_transaction(raw_tx_data_from_no_address)
-    print(f"  Обработанная транзакция (1): {processed_tx1}")
+    if VERBOSE:
+        print(f"  Обработанная транзакция (1): {processed_tx1}")
     
     from_display_name_1 = processed_tx1.get("Откуда")
     print(f"  Сгенерированное имя 'Откуда' (1): {from_display_name_1}")
@@ -68,10 +72,9 @@ def test_identifier_resolution_and_filtering():
 
     # 3. Тест: Проблемные данные от API - отсутствует `address` в `toAddress`
     print("\n3. Тест: `toAddress` без фактического адреса, но с entity name = 'ProblemEntityTo'")
-    address_cache = AddressCache() 
-    token_cache = TokenCache()
-    data_processor = DataProcessor(address_cache, token_cache)
-    transaction_filter = TransactionFilter(address_cache, token_cache)
+    # Чистые кеши; процессор и фильтр переиспользуются (фильтр заново разрешает ID в update())
+    address_cache.clear()
+    token_cache.clear()
 
     raw_tx_data_to_no_address = {
         "txid": "tx_to_no_addr",
@@ -93,7 +96,8 @@ def test_identifier_resolution_and_filtering():
     }
 
     processed_tx2 = data_processor.process_transaction(raw_tx_data_to_no_address)
-    print(f"  Обработанная транзакция (2): {processed_tx2}")
+    if VERBOSE:
+        print(f"  Обработанная транзакция (2): {processed_tx2}")
 
     to_display_name_2 = processed_tx2.get("Куда")
     print(f"  Сгенерированное имя 'Куда' (2): {to_display_name_2}")
@@ -113,10 +117,9 @@ def test_identifier_resolution_and_filtering():
 
     # 4. Тест: Нормальные данные (контрольный)
     print("\n4. Тест: Нормальные данные с фактическими адресами")
-    address_cache = AddressCache() 
-    token_cache = TokenCache()
-    data_processor = DataProcessor(address_cache, token_cache)
-    transaction_filter = TransactionFilter(address_cache, token_cache)
+    # Чистые кеши; процессор и фильтр переиспользуются (фильтр заново разрешает ID в update())
+    address_cache.clear()
+    token_cache.clear()
 
     raw_tx_data_normal = {
         "txid": "tx_normal",
@@ -138,7 +141,8 @@ def test_identifier_resolution_and_filtering():
         "tokenSymbol": "ETH"
     }
     processed_tx3 = data_processor.process_transaction(raw_tx_data_normal)
-    print(f"  Обработанная транзакция (3): {processed_tx3}")
+    if VERBOSE:
+        print(f"  Обработанная транзакция (3): {processed_tx3}")
 
     from_display_name_3 = processed_tx3.get("Откуда")
     to_display_name_3 = processed_tx3.get("Куда")
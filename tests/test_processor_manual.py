@@ -12,6 +12,10 @@ sys.path.insert(0, project_root)
 from arkham.cache import AddressCache, TokenCache
 from arkham.data_processor import DataProcessor
 
+# ARKHAM_TEST_VERBOSE=0 отключает подробный вывод по каждой транзакции (сырые данные, результат, кеши);
+# итоговые сравнения печатаются всегда
+VERBOSE = os.getenv('ARKHAM_TEST_VERBOSE', '1') != '0'
+
 # --- Пример "сырых" данных транзакций (имитация ответа API) ---
 MOCK_RAW_TRANSACTIONS = [
     # 1. Стандартная транзакция ETH с entity и label
@@ -130,30 +134,35 @@ def test_data_processor():
     print("\n--- Тестирование DataProcessor ---")
     address_cache = AddressCache()
     token_cache = TokenCache()
-    processor = DataProcessor(address_cache, token_cache)
+    processor = DataProcessor(address_cache, token_cache, keep_raw=True)
 
     processed_results = []
 
     print("\n1. Обработка транзакций по одной:")
     for i, raw_tx in enumerate(MOCK_RAW_TRANSACTIONS):
-        print(f"\n--- Обработка Транзакции #{i+1} ---")
-        print("Сырые данные (начало):")
-        print(json.dumps(raw_tx, indent=2)[:300] + "...") # Показываем начало сырых данных
+        if VERBOSE:
+            print(f"\n--- Обработка Транзакции #{i+1} ---")
+            print("Сырые данные (начало):")
+            print(json.dumps(raw_tx, indent=2)[:300] + "...") # Показываем начало сырых данных
         
         processed_tx = processor.process_transaction(raw_tx)
         
-        print("\nОбработанный результат:")
         if processed_tx:
-            print(json.dumps(processed_tx, indent=2))
             processed_results.append(processed_tx)
+        if not VERBOSE:
+            continue
+
+        print("\nОбработанный результат:")
+        if processed_tx:
+            print(json.dumps(processed_tx.to_dict(), indent=2))
         else:
             print("  Не удалось обработать транзакцию.")
             
         print("\nСостояние кешей ПОСЛЕ обработки:")
         print(f"  Address Cache (_cache): {processor.address_cache._cache}")
-        print(f"  Address Cache (_name_to_ids): {dict(processor.address_cache._name_to_ids)}")
+        print(f"  Address Cache (_name_to_ids): {processor.address_cache._name_to_ids}")
         print(f"  Token Cache (_id_to_symbol): {processor.token_cache._id_to_symbol}")
-        print(f"  Token Cache (_symbol_to_ids): {dict(processor.token_cache._symbol_to_ids)}")
+        print(f"  Token Cache (_symbol_to_ids): {processor.token_cache._symbol_to_ids}")
 
     print("\n\n--- Проверка пакетной обработки (должна дать те же результаты кешей) ---")
     # Создаем новые пустые кеши и процессор для чистоты эксперимента
@@ -172,16 +181,16 @@ def test_data_processor():
     
     print("\nИтоговое состояние кешей ПОСЛЕ пакетной обработки:")
     print(f"  Address Cache (_cache): {processor_batch.address_cache._cache}")
-    print(f"  Address Cache (_name_to_ids): {dict(processor_batch.address_cache._name_to_ids)}")
+    print(f"  Address Cache (_name_to_ids): {processor_batch.address_cache._name_to_ids}")
     print(f"  Token Cache (_id_to_symbol): {processor_batch.token_cache._id_to_symbol}")
-    print(f"  Token Cache (_symbol_to_ids): {dict(processor_batch.token_cache._symbol_to_ids)}")
+    print(f"  Token Cache (_symbol_to_ids): {processor_batch.token_cache._symbol_to_ids}")
     
     # Сравним состояние кешей (должно быть идентичным)
     print("\nСравнение состояния кешей (по одной vs пакет):")
     print(f"  Address _cache match: {processor.address_cache._cache == processor_batch.address_cache._cache}")
-    print(f"  Address _name_to_ids match: {dict(processor.address_cache._name_to_ids) == dict(processor_batch.address_cache._name_to_ids)}")
+    print(f"  Address _name_to_ids match: {processor.address_cache._name_to_ids == processor_batch.address_cache._name_to_ids}")
     print(f"  Token _id_to_symbol match: {processor.token_cache._id_to_symbol == processor_batch.token_cache._id_to_symbol}")
-    print(f"  Token _symbol_to_ids match: {dict(processor.token_cache._symbol_to_ids) == dict(processor_batch.token_cache._symbol_to_ids)}")
+    print(f"  Token _symbol_to_ids match: {processor.token_cache._symbol_to_ids == processor_batch.token_cache._symbol_to_ids}")
     assert processor.address_cache._cache == processor_batch.address_cache._cache
     assert processor.token_cache._symbol_to_ids == processor_batch.token_cache._symbol_to_ids
 